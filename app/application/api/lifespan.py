@@ -1,38 +1,221 @@
+import logging
+from collections import defaultdict
+
+import orjson
+from punq import Container
+
 from app.infra.message_brokers.base import BaseMessageBroker
-from app.logic.events.messages import NewMessageReceivedFromBrokerEvent
+from app.infra.message_brokers.converters import (
+    convert_broker_record_to_chat_oid,
+    convert_event_to_broker_message,
+)
+from app.infra.message_brokers.dtos import BrokerRecord
+from app.infra.repositories.messages.base import (
+    BaseChatsRepository,
+    BaseMessagesRepository,
+)
+from app.infra.repositories.messages.cached import CachedChatsRepository
+from app.infra.repositories.messages.mongo import (
+    BaseMongoDBRepository,
+    MongoDBMessagesRepository,
+)
+from app.logic.events.base import IntegrationEvent
+from app.logic.events.dispatchers import (
+    BackgroundEventDispatcher,
+    PartitionedEventDispatcher,
+)
+from app.logic.events.messages import (
+    ChatDeletedFromBrokerEvent,
+    ListenerAddedFromBrokerEvent,
+    NewMessagePayloadsReceivedFromBrokerEvent,
+    NewMessageReceivedFromBrokerEvent,
+)
 from app.logic.init import init_container
-from app.logic.mediator.base import Mediator
 from app.settings.config import Config
 
 
+logger = logging.getLogger(__name__)
+
+ChatBrokerEvent = type[ChatDeletedFromBrokerEvent | ListenerAddedFromBrokerEvent]
+
+
 async def init_message_broker():
     container = init_container()
     message_broker: BaseMessageBroker = container.resolve(BaseMessageBroker)
     await message_broker.start()
 
 
+def get_mongodb_repositories(container: Container) -> list[BaseMongoDBRepository]:
+    message_broker: BaseMessageBroker = container.resolve(BaseMessageBroker)
+    chat_repository = container.resolve(BaseChatsRepository)
+
+    if isinstance(chat_repository, CachedChatsRepository):
+        chat_repository = chat_repository.repository
+
+    candidates = [
+        chat_repository,
+        container.resolve(BaseMessagesRepository),
+        getattr(message_broker, "offsets_store", None),
+    ]
+
+    return [
+        repository
+        for repository in candidates
+        if isinstance(repository, BaseMongoDBRepository)
+    ]
+
+
+async def init_mongodb_indexes():
+    container = init_container()
+
+    for repository in get_mongodb_repositories(container):
+        try:
+            await repository.ensure_indexes()
+        except Exception:
+            # Existing data may violate a unique index, the service still has
+            # to start so that it can be cleaned up.
+            logger.exception(
+                "Could not create indexes for the %s collection",
+                repository.mongo_db_collection_name,
+            )
+
+
 async def consume_in_background():
     container = init_container()
     config: Config = container.resolve(Config)
     message_broker: BaseMessageBroker = container.resolve(BaseMessageBroker)
 
-    mediator: Mediator = container.resolve(Mediator)
+    # Chats are spread over the workers by their oid, so a busy chat only
+    # holds up the chats that share its worker.
+    dispatcher: PartitionedEventDispatcher = container.resolve(
+        PartitionedEventDispatcher,
+    )
+    dispatcher.start()
+    topic_events_map = get_topic_events_map(config)
+
+    try:
+        async for records in message_broker.start_consuming_batches(
+            topics=[config.new_messages_received_event_topic, *topic_events_map],
+            max_records=config.kafka_consumer_max_records,
+            timeout_ms=config.kafka_consumer_timeout_ms,
+        ):  # noqa
+            for event in convert_records_to_events(
+                records=records,
+                config=config,
+                topic_events_map=topic_events_map,
+            ):
+                await dispatcher.dispatch(key=event.chat_oid, event=event)
+    finally:
+        await dispatcher.stop()
+
+
+def get_topic_events_map(config: Config) -> dict[str, ChatBrokerEvent]:
+    """Events the records of other nodes are consumed as, by topic.
+
+    The handlers registered in the mediator for these events apply the
+    change on this node, e.g. close the websockets of a deleted chat.
+    New messages are not listed, they are grouped per chat instead.
+    """
+    return {
+        config.chat_deleted_event_topic: ChatDeletedFromBrokerEvent,
+        config.new_listener_added_event_topic: ListenerAddedFromBrokerEvent,
+    }
+
 
-    async for msg in message_broker.start_consuming(
-        config.new_messages_received_event_topic,
-    ):  # noqa
-        await mediator.publish(
-            [
+def convert_records_to_events(
+    records: list[BrokerRecord],
+    config: Config,
+    topic_events_map: dict[str, ChatBrokerEvent],
+) -> list[IntegrationEvent]:
+    """Convert a polled batch to events in the order of its records.
+
+    Runs of new message records are grouped per chat, a run ends at any
+    other record, so e.g. messages polled before a chat was deleted are
+    sent before its websockets are closed.
+    """
+    events = []
+    message_records = []
+
+    for record in records:
+        if record.topic == config.new_messages_received_event_topic:
+            message_records.append(record)
+            continue
+
+        event_type = topic_events_map.get(record.topic)
+
+        if event_type is None:
+            continue
+
+        events.extend(
+            group_records_by_chat(
+                records=message_records,
+                passthrough=config.kafka_consumer_passthrough,
+            ),
+        )
+        message_records = []
+        events.append(event_type(chat_oid=convert_broker_record_to_chat_oid(record)))
+
+    events.extend(
+        group_records_by_chat(
+            records=message_records,
+            passthrough=config.kafka_consumer_passthrough,
+        ),
+    )
+
+    return events
+
+
+def group_records_by_chat(
+    records: list[BrokerRecord],
+    passthrough: bool,
+) -> list[NewMessagePayloadsReceivedFromBrokerEvent]:
+    """Collect the payloads of a polled batch per chat, keeping their order,
+    so every chat receives the batch as a single frame."""
+    payloads_map: dict[str, list[bytes]] = defaultdict(list)
+
+    for record in records:
+        if passthrough:
+            # Record values are forwarded to the websockets as they are, only
+            # the routing key is read so the payload is never decoded.
+            chat_oid = convert_broker_record_to_chat_oid(record)
+            payload = record.value
+        else:
+            msg = orjson.loads(record.value)
+            chat_oid = msg["chat_oid"]
+            payload = convert_event_to_broker_message(
                 NewMessageReceivedFromBrokerEvent(
                     message_text=msg["message_text"],
                     message_oid=msg["message_oid"],
-                    chat_oid=msg["chat_oid"],
+                    chat_oid=chat_oid,
                 ),
-            ],
-        )
+            )
+
+        payloads_map[chat_oid].append(payload)
+
+    return [
+        NewMessagePayloadsReceivedFromBrokerEvent(chat_oid=chat_oid, payloads=payloads)
+        for chat_oid, payloads in payloads_map.items()
+    ]
+
+
+async def flush_messages_repository():
+    container = init_container()
+    messages_repository = container.resolve(BaseMessagesRepository)
+
+    if isinstance(messages_repository, MongoDBMessagesRepository):
+        await messages_repository.flush()
 
 
 async def close_message_broker():
     container = init_container()
+    config: Config = container.resolve(Config)
     message_broker: BaseMessageBroker = container.resolve(BaseMessageBroker)
+    event_dispatcher: BackgroundEventDispatcher = container.resolve(
+        BackgroundEventDispatcher,
+    )
+    # Handlers left in the background still publish through the broker.
+    await event_dispatcher.drain(timeout=config.events_background_drain_timeout)
+    # Messages sent without waiting for delivery may still sit in the
+    # producer batch, they have to reach the broker before it is closed.
+    await message_broker.flush()
     await message_broker.close()
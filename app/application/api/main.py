@@ -8,7 +8,9 @@ from punq import Container
 from app.application.api.lifespan import (
     close_message_broker,
     consume_in_background,
+    flush_messages_repository,
     init_message_broker,
+    init_mongodb_indexes,
 )
 from app.logic.init import init_container
 from app.application.api.v1.urls import router as v1_router
@@ -16,6 +18,7 @@ from app.application.api.v1.urls import router as v1_router
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    await init_mongodb_indexes()
     await init_message_broker()
 
     container: Container = init_container()
@@ -24,6 +27,7 @@ async def lifespan(app: FastAPI):
     job = await scheduler.spawn(consume_in_background())
 
     yield
+    await flush_messages_repository()
     await close_message_broker()
     await job.close()
 
@@ -5,6 +5,8 @@ from typing import (
 
 from pydantic import BaseModel
 
+from app.infra.repositories.filters.messages import CountMode
+
 
 class ErrorSchema(BaseModel):
     error: str
@@ -14,7 +16,10 @@ IT = TypeVar("IT")
 
 
 class BaseQueryResponseSchema(BaseModel, Generic[IT]):
-    count: int
+    count: int | None
+    count_mode: CountMode
     offset: int
     limit: int
     items: IT
+    previous_cursor: str | None = None
+    next_cursor: str | None = None
@@ -1,28 +1,67 @@
+from typing import Sequence
+
 from pydantic import BaseModel
 
+from app.domain.entities.base import BaseEntity
+from app.infra.repositories.filters.cursors import Cursor
 from app.infra.repositories.filters.messages import (
+    CountMode,
     GetMessagesFilters as GetMessagesInfraFilters,
     GetAllChatsFilters,
 )
+from app.logic.exceptions.messages import InvalidCursorException
 
 
-class GetMessagesFilters(BaseModel):
+class BaseCursorFilters(BaseModel):
     limit: int = 10
     offset: int = 0
+    before: str | None = None
+    after: str | None = None
+    count: CountMode = CountMode.ESTIMATED
+
+    def _decode_cursor(self, value: str | None) -> Cursor | None:
+        if value is None:
+            return None
+
+        try:
+            return Cursor.decode(value)
+        except ValueError:
+            raise InvalidCursorException(cursor=value)
 
+
+class GetMessagesFilters(BaseCursorFilters):
     def to_infra(self):
         return GetMessagesInfraFilters(
             limit=self.limit,
             offset=self.offset,
+            before=self._decode_cursor(self.before),
+            after=self._decode_cursor(self.after),
+            count=self.count,
         )
 
 
-class GetChatsFilters(BaseModel):
-    limit: int = 10
-    offset: int = 0
-
+class GetChatsFilters(BaseCursorFilters):
     def to_infra(self):
         return GetAllChatsFilters(
             limit=self.limit,
             offset=self.offset,
+            before=self._decode_cursor(self.before),
+            after=self._decode_cursor(self.after),
+            count=self.count,
         )
+
+
+def encode_page_cursors(
+    entities: Sequence[BaseEntity],
+) -> tuple[str | None, str | None]:
+    """Cursors to request the pages right before and right after the
+    given one."""
+    if not entities:
+        return None, None
+
+    first, last = entities[0], entities[-1]
+
+    return (
+        Cursor(created_at=first.created_at, oid=first.oid).encode(),
+        Cursor(created_at=last.created_at, oid=last.oid).encode(),
+    )
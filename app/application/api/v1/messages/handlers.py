@@ -8,13 +8,20 @@ from fastapi.routing import APIRouter
 from punq import Container
 
 from app.application.api.schemas import ErrorSchema
-from app.application.api.v1.messages.filters import GetMessagesFilters, GetChatsFilters
+from app.application.api.v1.messages.filters import (
+    GetMessagesFilters,
+    GetChatsFilters,
+    encode_page_cursors,
+)
 from app.application.api.v1.messages.schemas import (
     ChatDetailSchema,
     CreateChatRequestSchema,
     CreateChatResponseSchema,
     CreateMessageRequestSchema,
     CreateMessageResponseSchema,
+    CreateMessagesRequestSchema,
+    CreateMessagesResponseSchema,
+    CreateMessagesResultItemSchema,
     GetMessagesQueryResponseSchema,
     MessageDetailSchema,
     GetChatsQueryResponseSchema,
@@ -26,6 +33,8 @@ from app.domain.exceptions.base import ApplicationException
 from app.logic.commands.messages import (
     CreateChatCommand,
     CreateMessageCommand,
+    CreateMessagesCommand,
+    CreateMessagesCommandItem,
     DeleteChatCommand,
     AddTelegramListenerCommand,
 )
@@ -105,6 +114,49 @@ async def create_message_handler(
     return CreateMessageResponseSchema.from_entity(message)
 
 
+@router.post(
+    "/{chat_oid}/messages/bulk/",
+    status_code=status.HTTP_201_CREATED,
+    description=(
+        "Handle for adding up to 1000 messages to the chat with the passed ObjectID "
+        "at once, every item gets either the created message or its error."
+    ),
+    responses={
+        status.HTTP_201_CREATED: {"model": CreateMessagesResponseSchema},
+        status.HTTP_400_BAD_REQUEST: {"model": ErrorSchema},
+    },
+)
+async def create_messages_handler(
+    chat_oid: str,
+    schema: CreateMessagesRequestSchema,
+    container: Container = Depends(init_container),
+) -> CreateMessagesResponseSchema:
+    """Add many messages to the chat."""
+    mediator: Mediator = container.resolve(Mediator)
+
+    try:
+        results, *_ = await mediator.handle_command(
+            CreateMessagesCommand(
+                chat_oid=chat_oid,
+                messages=[
+                    CreateMessagesCommandItem(text=item.text, source=item.source)
+                    for item in schema.messages
+                ],
+            ),
+        )
+    except ApplicationException as exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": exception.message},
+        )
+
+    return CreateMessagesResponseSchema(
+        items=[
+            CreateMessagesResultItemSchema.from_result(result) for result in results
+        ],
+    )
+
+
 @router.get(
     "/{chat_oid}/",
     status_code=status.HTTP_200_OK,
@@ -134,7 +186,12 @@ async def get_chat_with_messages_handler(
 @router.get(
     "/{chat_oid}/messages/",
     status_code=status.HTTP_200_OK,
-    description="All sent chat messages.",
+    description=(
+        "All sent chat messages ordered by creation time. Pass 'previous_cursor' "
+        "as 'before' or 'next_cursor' as 'after' to page through the history "
+        "without an offset. 'count' selects an exact, an estimated (maintained "
+        "counter) or no total count."
+    ),
     responses={
         status.HTTP_200_OK: {"model": GetMessagesQueryResponseSchema},
         status.HTTP_400_BAD_REQUEST: {"model": ErrorSchema},
@@ -157,18 +214,26 @@ async def get_chat_messages_handler(
             detail={"error": exception.message},
         )
 
+    previous_cursor, next_cursor = encode_page_cursors(messages)
+
     return GetMessagesQueryResponseSchema(
         count=count,
+        count_mode=filters.count,
         limit=filters.limit,
         offset=filters.offset,
         items=[MessageDetailSchema.from_entity(message) for message in messages],
+        previous_cursor=previous_cursor,
+        next_cursor=next_cursor,
     )
 
 
 @router.get(
     "/",
     status_code=status.HTTP_200_OK,
-    description="All chat at that moment.",
+    description=(
+        "All chat at that moment. 'count' selects an exact, an estimated "
+        "(collection metadata) or no total count."
+    ),
     responses={
         status.HTTP_200_OK: {"model": GetChatsQueryResponseSchema},
         status.HTTP_400_BAD_REQUEST: {"model": ErrorSchema},
@@ -190,11 +255,16 @@ async def get_all_chats_handler(
             detail={"error": exception.message},
         )
 
+    previous_cursor, next_cursor = encode_page_cursors(chats)
+
     return GetChatsQueryResponseSchema(
         count=count,
+        count_mode=filters.count,
         limit=filters.limit,
         offset=filters.offset,
         items=[ChatDetailSchema.from_entity(chat) for chat in chats],
+        previous_cursor=previous_cursor,
+        next_cursor=next_cursor,
     )
 
 
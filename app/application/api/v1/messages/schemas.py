@@ -1,8 +1,12 @@
 from datetime import datetime
 
-from pydantic import BaseModel
+from pydantic import (
+    BaseModel,
+    Field,
+)
 
 from app.application.api.schemas import BaseQueryResponseSchema
+from app.domain.exceptions.base import ApplicationException
 from app.domain.entities.messages import (
     Chat,
     Message,
@@ -43,6 +47,33 @@ class CreateMessageResponseSchema(BaseModel):
         )
 
 
+class CreateMessagesRequestSchema(BaseModel):
+    messages: list[CreateMessageRequestSchema] = Field(min_length=1, max_length=1000)
+
+
+class CreateMessagesResultItemSchema(BaseModel):
+    oid: str | None = None
+    text: str | None = None
+    error: str | None = None
+
+    @classmethod
+    def from_result(
+        cls,
+        result: Message | ApplicationException,
+    ) -> "CreateMessagesResultItemSchema":
+        if isinstance(result, ApplicationException):
+            return cls(error=result.message)
+
+        return cls(
+            oid=result.oid,
+            text=result.text.as_generic_type(),
+        )
+
+
+class CreateMessagesResponseSchema(BaseModel):
+    items: list[CreateMessagesResultItemSchema]
+
+
 class MessageDetailSchema(BaseModel):
     oid: str
     text: str
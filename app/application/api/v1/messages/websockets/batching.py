@@ -0,0 +1,168 @@
+import asyncio
+import logging
+from collections.abc import (
+    Awaitable,
+    Callable,
+)
+from dataclasses import (
+    dataclass,
+    field,
+)
+from typing import Any
+
+import orjson
+
+from app.domain.entities.messages import Message
+from app.domain.exceptions.base import ApplicationException
+from app.logic.commands.messages import (
+    CreateMessagesCommand,
+    CreateMessagesCommandItem,
+)
+from app.logic.mediator.base import Mediator
+
+
+logger = logging.getLogger(__name__)
+
+STORE_FAILED_ERROR = "Message could not be stored"
+
+
+@dataclass(frozen=True)
+class InboundMessageFrame:
+    text: str
+    source: str = "web"
+    frame_id: Any = None
+
+
+def convert_text_to_inbound_frame(text: str) -> InboundMessageFrame:
+    """Parse a ``{"text": ..., "source": ..., "id": ...}`` frame, raising
+    ``ValueError`` for anything else."""
+    try:
+        data = orjson.loads(text)
+    except orjson.JSONDecodeError:
+        raise ValueError("Frame is not valid JSON")
+
+    if not isinstance(data, dict) or not isinstance(data.get("text"), str):
+        raise ValueError('Frame has to be an object with a "text" string')
+
+    return InboundMessageFrame(
+        text=data["text"],
+        source=str(data.get("source", "web")),
+        frame_id=data.get("id"),
+    )
+
+
+def convert_result_to_ack(
+    frame_id: Any,
+    result: Message | Exception,
+) -> bytes:
+    if isinstance(result, ApplicationException):
+        return orjson.dumps({"ack": frame_id, "error": result.message})
+
+    if isinstance(result, ValueError):
+        return orjson.dumps({"ack": frame_id, "error": str(result)})
+
+    if isinstance(result, Exception):
+        # Internal errors are logged, the client only learns that it failed.
+        return orjson.dumps({"ack": frame_id, "error": STORE_FAILED_ERROR})
+
+    return orjson.dumps({"ack": frame_id, "oid": result.oid})
+
+
+@dataclass(eq=False)
+class InboundMessagesBatcher:
+    """Collects the messages a client sends over its websocket.
+
+    Frames arriving within ``max_delay`` seconds of the first one, up to
+    ``max_batch_size``, are stored with a single ``CreateMessagesCommand``.
+    Every frame is acknowledged through ``ack`` with the message oid or
+    the error, in the order the frames were received.
+    """
+
+    mediator: Mediator
+    chat_oid: str
+    ack: Callable[[bytes], Awaitable[None]]
+    max_batch_size: int = 100
+    max_delay: float = 0.005
+    _queue: asyncio.Queue[InboundMessageFrame | None] = field(init=False)
+    _task: asyncio.Task | None = field(default=None, init=False)
+
+    def __post_init__(self):
+        # Bounded, so a client sending faster than messages are stored
+        # stops being read and is slowed down by TCP.
+        self._queue = asyncio.Queue(maxsize=self.max_batch_size * 2)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def put(self, text: str):
+        try:
+            frame = convert_text_to_inbound_frame(text)
+        except ValueError as error:
+            await self.ack(convert_result_to_ack(None, error))
+            return
+
+        await self._queue.put(frame)
+
+    async def close(self):
+        """Store the frames received so far and stop."""
+        if self._task is None or self._task.done():
+            return
+
+        await self._queue.put(None)
+        await self._task
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        closed = False
+
+        while not closed:
+            frame = await self._queue.get()
+
+            if frame is None:
+                return
+
+            batch = [frame]
+            deadline = loop.time() + self.max_delay
+
+            while len(batch) < self.max_batch_size:
+                try:
+                    frame = await asyncio.wait_for(
+                        self._queue.get(),
+                        timeout=max(deadline - loop.time(), 0),
+                    )
+                except TimeoutError:
+                    break
+
+                if frame is None:
+                    closed = True
+                    break
+
+                batch.append(frame)
+
+            await self._handle_batch(batch)
+
+    async def _handle_batch(self, batch: list[InboundMessageFrame]):
+        command = CreateMessagesCommand(
+            chat_oid=self.chat_oid,
+            messages=[
+                CreateMessagesCommandItem(text=frame.text, source=frame.source)
+                for frame in batch
+            ],
+        )
+
+        try:
+            results, *_ = await self.mediator.handle_command(command)
+        except ApplicationException as exception:
+            results = [exception] * len(batch)
+        except Exception as exception:
+            # The batcher keeps running, otherwise the bounded queue fills
+            # up and the reader of the socket blocks forever.
+            logger.exception(
+                "Could not store %d messages of chat %s",
+                len(batch),
+                self.chat_oid,
+            )
+            results = [exception] * len(batch)
+
+        for frame, result in zip(batch, results):
+            await self.ack(convert_result_to_ack(frame.frame_id, result))
@@ -1,17 +1,22 @@
+from functools import partial
+
 from fastapi import (
     Depends,
     WebSocketDisconnect,
 )
 from fastapi.routing import APIRouter
 from fastapi.websockets import WebSocket
-
 from punq import Container
 
+from app.application.api.v1.messages.websockets.batching import (
+    InboundMessagesBatcher,
+)
 from app.infra.websockets.managers import BaseConnectionManager
 from app.logic.exceptions.messages import ChatNotFoundException
 from app.logic.init import init_container
 from app.logic.mediator.base import Mediator
 from app.logic.queries.messages import GetChatDetailQuery
+from app.settings.config import Config
 
 router = APIRouter(
     prefix="/chats",
@@ -23,22 +28,53 @@ router = APIRouter(
 async def websocket_endpoint(
     chat_oid: str,
     websocket: WebSocket,
+    since: int | None = None,
+    epoch: str | None = None,
     container: Container = Depends(init_container),
 ):
+    """Stream the chat to the client.
+
+    Every JSON frame carries ``seq`` and ``epoch``, a client reconnecting
+    with ``?since=<seq>&epoch=<epoch>`` first gets the frames it missed.
+
+    Clients post messages with ``{"text": ..., "id": ...}`` frames, each one
+    is acknowledged with ``{"ack": <id>, "oid": ...}`` or
+    ``{"ack": <id>, "error": ...}``.
+    """
     connection_manager: BaseConnectionManager = container.resolve(BaseConnectionManager)
     mediator: Mediator = container.resolve(Mediator)
+    config: Config = container.resolve(Config)
 
     try:
         await mediator.handle_query(GetChatDetailQuery(chat_oid=chat_oid))
     except ChatNotFoundException as error:
         await websocket.send_json(data={"error": error.message})
         await websocket.close()
+        return
+
+    await connection_manager.accept_connection(
+        websocket=websocket,
+        key=chat_oid,
+        since=since,
+        epoch=epoch,
+    )
 
-    await connection_manager.accept_connection(websocket=websocket, key=chat_oid)
+    batcher = InboundMessagesBatcher(
+        mediator=mediator,
+        chat_oid=chat_oid,
+        ack=partial(connection_manager.send, websocket, chat_oid),
+        max_batch_size=config.websocket_inbound_batch_size,
+        max_delay=config.websocket_inbound_batch_delay,
+    )
+    batcher.start()
 
     try:
         while True:
-            await websocket.receive_text()
+            await batcher.put(await websocket.receive_text())
 
     except WebSocketDisconnect:
+        pass
+
+    finally:
         await connection_manager.remove_connection(websocket=websocket, key=chat_oid)
+        await batcher.close()
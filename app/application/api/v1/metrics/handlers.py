@@ -0,0 +1,72 @@
+from fastapi import Depends
+from fastapi.routing import APIRouter
+
+from punq import Container
+
+from app.application.api.v1.metrics.schemas import (
+    MediatorMetricsSchema,
+    MetricsResponseSchema,
+)
+from app.infra.repositories.messages.base import (
+    BaseChatsRepository,
+    BaseMessagesRepository,
+)
+from app.infra.repositories.messages.cached import CachedChatsRepository
+from app.infra.repositories.messages.mongo import MongoDBMessagesRepository
+from app.logic.events.dispatchers import (
+    BackgroundEventDispatcher,
+    PartitionedEventDispatcher,
+)
+from app.logic.init import init_container
+from app.logic.mediator.base import Mediator
+from app.logic.mediator.middlewares import (
+    ExceptionCountingMiddleware,
+    InFlightMiddleware,
+    LatencyHistogramMiddleware,
+)
+from app.settings.config import Config
+
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["Metrics"],
+)
+
+
+@router.get(
+    "/",
+    description="Endpoint returns the counters of the mediator, the event dispatchers and the repositories of this node.",
+)
+async def get_metrics_handler(
+    container: Container = Depends(init_container),
+) -> MetricsResponseSchema:
+    """Get the metrics of this node."""
+    config: Config = container.resolve(Config)
+    mediator: Mediator = container.resolve(Mediator)
+    chat_repository = container.resolve(BaseChatsRepository)
+    messages_repository = container.resolve(BaseMessagesRepository)
+    mediator_metrics = None
+
+    if config.mediator_metrics_enabled:
+        mediator_metrics = MediatorMetricsSchema.from_middlewares(
+            latency=container.resolve(LatencyHistogramMiddleware),
+            in_flight=container.resolve(InFlightMiddleware),
+            exceptions=container.resolve(ExceptionCountingMiddleware),
+        )
+
+    return MetricsResponseSchema(
+        mediator=mediator_metrics,
+        queries_coalescing=mediator.coalescing_stats(),
+        background_events=container.resolve(BackgroundEventDispatcher).stats(),
+        consumer_workers=container.resolve(PartitionedEventDispatcher).stats(),
+        chats_cache=(
+            chat_repository.stats()
+            if isinstance(chat_repository, CachedChatsRepository)
+            else None
+        ),
+        messages_group_commit=(
+            messages_repository.group_commit_stats()
+            if isinstance(messages_repository, MongoDBMessagesRepository)
+            else None
+        ),
+    )
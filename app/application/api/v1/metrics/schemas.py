@@ -0,0 +1,56 @@
+from pydantic import BaseModel
+
+from app.infra.repositories.messages.cached import CacheStats
+from app.infra.repositories.messages.mongo import GroupCommitStats
+from app.logic.events.dispatchers import (
+    BackgroundEventDispatcherStats,
+    EventWorkerStats,
+)
+from app.logic.mediator.base import CoalescingStats
+from app.logic.mediator.middlewares import (
+    ExceptionCountingMiddleware,
+    InFlightMiddleware,
+    LatencyHistogram,
+    LatencyHistogramMiddleware,
+)
+
+
+class ExceptionCountSchema(BaseModel):
+    message: str
+    exception: str
+    count: int
+
+
+class MediatorMetricsSchema(BaseModel):
+    latency: dict[str, LatencyHistogram]
+    in_flight: dict[str, int]
+    exceptions: list[ExceptionCountSchema]
+
+    @classmethod
+    def from_middlewares(
+        cls,
+        latency: LatencyHistogramMiddleware,
+        in_flight: InFlightMiddleware,
+        exceptions: ExceptionCountingMiddleware,
+    ) -> "MediatorMetricsSchema":
+        return MediatorMetricsSchema(
+            latency=dict(latency.histograms),
+            in_flight=dict(in_flight.in_flight),
+            exceptions=[
+                ExceptionCountSchema(
+                    message=message,
+                    exception=exception,
+                    count=count,
+                )
+                for (message, exception), count in exceptions.exceptions.items()
+            ],
+        )
+
+
+class MetricsResponseSchema(BaseModel):
+    mediator: MediatorMetricsSchema | None
+    queries_coalescing: CoalescingStats
+    background_events: BackgroundEventDispatcherStats
+    consumer_workers: list[EventWorkerStats]
+    chats_cache: CacheStats | None
+    messages_group_commit: GroupCommitStats | None
@@ -1,6 +1,7 @@
 from fastapi.routing import APIRouter
 
 from app.application.api.v1.messages.handlers import router as message_router
+from app.application.api.v1.metrics.handlers import router as metrics_router
 from app.application.api.v1.messages.websockets.messages import (
     router as message_ws_router,
 )
@@ -12,3 +13,4 @@ router = APIRouter(
 
 router.include_router(message_router)
 router.include_router(message_ws_router)
+router.include_router(metrics_router)
@@ -0,0 +1,30 @@
+"""Recount the messages of every chat and repair the maintained
+``messages_count`` counters.
+
+Usage: ``python -m app.application.cli.counters``
+"""
+
+import asyncio
+
+from app.infra.repositories.messages.base import BaseMessagesRepository
+from app.infra.repositories.messages.mongo import MongoDBMessagesRepository
+from app.logic.init import init_container
+
+
+async def reconcile_messages_counts() -> None:
+    repository = init_container().resolve(BaseMessagesRepository)
+
+    if not isinstance(repository, MongoDBMessagesRepository):
+        print("Messages are not stored in MongoDB, nothing to reconcile.")
+        return
+
+    updated_count = await repository.reconcile_messages_counts()
+    print(f"Updated message counters of {updated_count} chats.")
+
+
+def main():
+    asyncio.run(reconcile_messages_counts())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Create the MongoDB indexes or report the ones missing on the live
+collections.
+
+Usage: ``python -m app.application.cli.indexes [--report]``
+"""
+
+import argparse
+import asyncio
+import sys
+
+from app.application.api.lifespan import get_mongodb_repositories
+from app.logic.init import init_container
+
+
+async def report_missing_indexes() -> int:
+    missing_count = 0
+
+    for repository in get_mongodb_repositories(init_container()):
+        for index in await repository.get_missing_indexes():
+            missing_count += 1
+            print(
+                f"{repository.mongo_db_collection_name}: missing index "
+                f"{index.document['name']} {dict(index.document['key'])}",
+            )
+
+    if not missing_count:
+        print("All indexes are in place.")
+
+    return missing_count
+
+
+async def create_indexes() -> None:
+    for repository in get_mongodb_repositories(init_container()):
+        await repository.ensure_indexes()
+        print(f"{repository.mongo_db_collection_name}: indexes are in place.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--report",
+        action="store_true",
+        help="Only list the missing indexes, exit with 1 if there are any.",
+    )
+    args = parser.parse_args()
+
+    if args.report:
+        sys.exit(1 if asyncio.run(report_missing_indexes()) else 0)
+
+    asyncio.run(create_indexes())
+
+
+if __name__ == "__main__":
+    main()
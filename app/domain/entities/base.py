@@ -1,23 +1,23 @@
 from abc import ABC
-from copy import copy
 from dataclasses import (
     dataclass,
     field,
 )
 from datetime import datetime
-from uuid import uuid4
 
 from app.domain.events.base import BaseEvent
+from app.domain.ids import generate_oid
 
 
-@dataclass
+@dataclass(slots=True)
 class BaseEntity(ABC):
     oid: str = field(
-        default_factory=lambda: str(uuid4()),
+        default_factory=generate_oid,
         kw_only=True,
     )
-    _events: list[BaseEvent] = field(
-        default_factory=list,
+    # Created with the first event, entities read from storage never get one.
+    _events: list[BaseEvent] | None = field(
+        default=None,
         kw_only=True,
     )
     created_at: datetime = field(
@@ -32,10 +32,13 @@ class BaseEntity(ABC):
         return self.oid == __value.oid
 
     def register_event(self, event: BaseEvent) -> None:
+        if self._events is None:
+            self._events = []
+
         self._events.append(event)
 
     def pull_events(self) -> list[BaseEvent]:
-        registered_events = copy(self._events)
-        self._events.clear()
+        registered_events = self._events or []
+        self._events = None
 
         return registered_events
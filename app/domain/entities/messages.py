@@ -17,18 +17,18 @@ from app.domain.values.messages import (
 )
 
 
-@dataclass(eq=False)
+@dataclass(eq=False, slots=True)
 class Message(BaseEntity):
     chat_oid: str
     text: Text
     source: str
 
 
-@dataclass(eq=False)
+@dataclass(eq=False, slots=True)
 class ChatListener(BaseEntity): ...
 
 
-@dataclass(eq=False)
+@dataclass(eq=False, slots=True)
 class Chat(BaseEntity):
     title: Title
     messages: set[Message] = field(default_factory=set, kw_only=True)
@@ -66,4 +66,6 @@ class Chat(BaseEntity):
         if listener in self.listeners:
             raise ListenerAlreadyExistsException(listener_id=listener.oid)
         self.listeners.add(listener)
-        self.register_event(ListenerAddedEvent(listener_id=listener.oid))
+        self.register_event(
+            ListenerAddedEvent(listener_id=listener.oid, chat_oid=self.oid),
+        )
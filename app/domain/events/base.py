@@ -5,15 +5,24 @@ from dataclasses import (
 )
 from datetime import datetime
 from typing import ClassVar
-from uuid import (
-    UUID,
-    uuid4,
-)
+from uuid import UUID
+
+from app.domain.ids import generate_id
 
 
-@dataclass
+@dataclass(slots=True)
 class BaseEvent(ABC):
     event_title: ClassVar[str]
+    # Events that name the field holding their aggregate id are handled in
+    # order per aggregate when published concurrently.
+    aggregate_oid_field: ClassVar[str | None] = None
 
-    event_id: UUID = field(default_factory=uuid4, kw_only=True)
+    event_id: UUID = field(default_factory=generate_id, kw_only=True)
     occurred_at: datetime = field(default_factory=datetime.now, kw_only=True)
+
+    @property
+    def aggregate_oid(self) -> str | None:
+        if self.aggregate_oid_field is None:
+            return None
+
+        return getattr(self, self.aggregate_oid_field)
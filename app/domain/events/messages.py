@@ -4,9 +4,10 @@ from typing import ClassVar
 from app.domain.events.base import BaseEvent
 
 
-@dataclass
+@dataclass(slots=True)
 class NewMessageReceivedEvent(BaseEvent):
     event_title: ClassVar[str] = "New Message Received"
+    aggregate_oid_field: ClassVar[str] = "chat_oid"
 
     message_text: str
     message_oid: str
@@ -14,23 +15,27 @@ class NewMessageReceivedEvent(BaseEvent):
     source: str
 
 
-@dataclass
+@dataclass(slots=True)
 class NewChatCreatedEvent(BaseEvent):
     event_title: ClassVar[str] = "New Chat Created"
+    aggregate_oid_field: ClassVar[str] = "chat_oid"
 
     chat_oid: str
     chat_title: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ChatDeletedEvent(BaseEvent):
     event_title: ClassVar[str] = "Chat has been deleted"
+    aggregate_oid_field: ClassVar[str] = "chat_oid"
 
     chat_oid: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ListenerAddedEvent(BaseEvent):
     event_title: ClassVar[str] = "New listener added"
+    aggregate_oid_field: ClassVar[str] = "chat_oid"
 
     listener_id: str
+    chat_oid: str
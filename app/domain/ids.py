@@ -0,0 +1,76 @@
+import os
+import threading
+import time
+from collections.abc import Callable
+from uuid import (
+    UUID,
+    uuid4,
+)
+
+
+IdGenerator = Callable[[], UUID]
+
+
+class UUID7Generator:
+    """Generates UUIDv7 values (RFC 9562), ordered by creation time.
+
+    The 48-bit millisecond timestamp comes first, followed by a 12-bit
+    counter that keeps ids created within the same millisecond in order,
+    so ids of one process are strictly increasing.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_timestamp = 0
+        self._counter = 0
+
+    def __call__(self) -> UUID:
+        random_bits = int.from_bytes(os.urandom(8))
+
+        with self._lock:
+            timestamp = time.time_ns() // 1_000_000
+
+            if timestamp > self._last_timestamp:
+                # Seeded randomly but below half of the range, leaving room
+                # for the ids that follow within the same millisecond.
+                self._counter = random_bits >> 53
+            elif self._counter < 0xFFF:
+                timestamp = self._last_timestamp
+                self._counter += 1
+            else:
+                timestamp = self._last_timestamp + 1
+                self._counter = 0
+
+            self._last_timestamp = timestamp
+            counter = self._counter
+
+        return UUID(
+            int=(
+                timestamp << 80
+                | 0x7 << 76
+                | counter << 64
+                | 0b10 << 62
+                | random_bits & 0x3FFF_FFFF_FFFF_FFFF
+            ),
+        )
+
+
+ID_GENERATORS: dict[str, IdGenerator] = {
+    "uuid4": uuid4,
+    "uuid7": UUID7Generator(),
+}
+
+_id_generator: IdGenerator = ID_GENERATORS["uuid7"]
+
+
+def set_id_generator(id_generator: IdGenerator):
+    global _id_generator
+    _id_generator = id_generator
+
+
+def generate_id() -> UUID:
+    return _id_generator()
+
+
+def generate_oid() -> str:
+    return str(_id_generator())
@@ -17,7 +17,22 @@ class BaseMessageBroker(ABC):
     async def send_message(self, key: bytes, topic: str, value: bytes): ...
 
     @abstractmethod
-    async def start_consuming(self, topic: str): ...
+    async def send_messages(
+        self,
+        topic: str,
+        messages: list[tuple[bytes | None, bytes]],
+    ): ...
+
+    @abstractmethod
+    async def flush(self): ...
+
+    @abstractmethod
+    async def start_consuming_batches(
+        self,
+        topics: list[str],
+        max_records: int,
+        timeout_ms: int,
+    ): ...
 
     @abstractmethod
     async def stop_consuming(self): ...
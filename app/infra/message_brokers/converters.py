@@ -1,9 +1,31 @@
 import orjson
 
 from app.domain.events.base import BaseEvent
+from app.infra.message_brokers.dtos import BrokerRecord
 
 
 def convert_event_to_broker_message(event: BaseEvent) -> bytes:
     return orjson.dumps(
         event,
     )
+
+
+def convert_broker_record_to_chat_oid(record: BrokerRecord) -> str:
+    """Read the chat routing key of a record without touching the payload
+    when the producer has set it as the record key."""
+    if record.key:
+        return record.key.decode()
+
+    return orjson.loads(record.value)["chat_oid"]
+
+
+def convert_payloads_to_frame(payloads: list[bytes]) -> bytes:
+    """Combine several JSON payloads into a single websocket frame.
+
+    A single payload is sent as it is, several payloads are wrapped into
+    ``{"messages": [...]}`` without decoding them.
+    """
+    if len(payloads) == 1:
+        return payloads[0]
+
+    return b'{"messages":[' + b",".join(payloads) + b"]}"
@@ -0,0 +1,8 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class BrokerRecord:
+    topic: str
+    key: bytes | None
+    value: bytes
@@ -1,30 +1,277 @@
+import asyncio
+import logging
 from dataclasses import (
     dataclass,
+    field,
+)
+from typing import (
+    AsyncIterator,
+    Callable,
 )
-from typing import AsyncIterator
 
-import orjson
+import aiokafka
 from aiokafka import (
     AIOKafkaConsumer,
     AIOKafkaProducer,
+    TopicPartition,
 )
 
 from app.infra.message_brokers.base import BaseMessageBroker
+from app.infra.message_brokers.dtos import BrokerRecord
+from app.infra.message_brokers.offsets import BaseOffsetsStore
+
+
+logger = logging.getLogger(__name__)
+
+
+DeliveryFailureCallback = Callable[[str, bytes, BaseException], None]
+
+
+def log_delivery_failure(topic: str, key: bytes, exception: BaseException):
+    logger.error(
+        "Failed to deliver message with key %r to topic %s",
+        key,
+        topic,
+        exc_info=exception,
+    )
+
+
+async def refresh_topics_metadata(consumer: AIOKafkaConsumer, topics: list[str]):
+    """Fetch the metadata of ``topics`` into the cluster metadata the
+    consumer reads partitions from.
+
+    aiokafka has no public call for it, only the whole metadata can be
+    refreshed, so this relies on the internals of its client and raises
+    ``RuntimeError`` when an aiokafka upgrade changes them.
+    """
+    client = getattr(consumer, "_client", None)
+    metadata_update = getattr(client, "_metadata_update", None)
+    cluster = getattr(client, "cluster", None)
+
+    if metadata_update is None or cluster is None:
+        raise RuntimeError(
+            f"aiokafka {aiokafka.__version__} does not provide the client "
+            "internals needed to refresh the metadata of single topics",
+        )
+
+    await metadata_update(cluster, topics)
 
 
 @dataclass
 class KafkaMessageBroker(BaseMessageBroker):
     producer: AIOKafkaProducer
     consumer: AIOKafkaConsumer
+    wait_for_delivery: bool = field(default=True, kw_only=True)
+    max_in_flight: int = field(default=1000, kw_only=True)
+    on_delivery_failure: DeliveryFailureCallback = field(
+        default=log_delivery_failure,
+        kw_only=True,
+    )
+    broadcast: bool = field(default=False, kw_only=True)
+    instance_id: str | None = field(default=None, kw_only=True)
+    offsets_store: BaseOffsetsStore | None = field(default=None, kw_only=True)
+    metadata_retry_backoff_ms: int = field(default=1000, kw_only=True)
+    _in_flight: asyncio.Semaphore | None = field(default=None, kw_only=True)
+
+    async def send_message(
+        self,
+        key: bytes,
+        topic: str,
+        value: bytes,
+    ) -> asyncio.Future | None:
+        """Send a message to the topic.
+
+        With ``wait_for_delivery`` disabled the message is only appended
+        to the producer batch and the delivery future is returned, the
+        outcome is reported through ``on_delivery_failure``.
+        """
+        if self.wait_for_delivery:
+            await self.producer.send_and_wait(key=key, topic=topic, value=value)
+            return None
+
+        if self._in_flight is None:
+            self._in_flight = asyncio.Semaphore(self.max_in_flight)
+
+        await self._in_flight.acquire()
+
+        try:
+            delivery = await self.producer.send(key=key, topic=topic, value=value)
+        except BaseException:
+            self._in_flight.release()
+            raise
+
+        delivery.add_done_callback(
+            lambda future: self._on_delivery(future, topic=topic, key=key),
+        )
+        return delivery
+
+    async def send_messages(
+        self,
+        topic: str,
+        messages: list[tuple[bytes | None, bytes]],
+    ) -> list[asyncio.Future]:
+        """Send ``(key, value)`` pairs to the topic.
+
+        All messages are appended to the producer batch before waiting for
+        any delivery, so they go out in as few requests as possible.
+        """
+        if not self.wait_for_delivery:
+            return [
+                await self.send_message(key=key, topic=topic, value=value)
+                for key, value in messages
+            ]
+
+        deliveries = [
+            await self.producer.send(key=key, topic=topic, value=value)
+            for key, value in messages
+        ]
+        await asyncio.gather(*deliveries)
+
+        return []
+
+    def _on_delivery(self, delivery: asyncio.Future, topic: str, key: bytes):
+        self._in_flight.release()
+
+        if delivery.cancelled():
+            return
+
+        exception = delivery.exception()
+
+        if exception is not None:
+            self.on_delivery_failure(topic, key, exception)
+
+    async def flush(self):
+        await self.producer.flush()
+
+    async def _subscribe(self, topics: list[str]) -> bool:
+        """Start consuming the topics, returns whether all of them exist.
+
+        A broadcast consumer is assigned the partitions of the topics that
+        exist, the missing ones have to be picked up later with
+        ``_assign_new_partitions``.
+        """
+        if not self.broadcast:
+            self.consumer.subscribe(topics=topics)
+            return True
+
+        # Every instance reads all partitions on its own, there is no group
+        # to join and no rebalance to wait for before the first message.
+        return await self._assign_new_partitions(topics=topics, latest=True)
+
+    async def _assign_new_partitions(self, topics: list[str], latest: bool) -> bool:
+        """Add the partitions of ``topics`` that are not assigned yet.
+
+        New partitions continue from the stored offsets, otherwise from the
+        end when ``latest`` is set and from the beginning when they were
+        created after the consumer started. Returns whether all topics
+        exist.
+        """
+        await self._refresh_metadata(topics)
+
+        assigned = self.consumer.assignment()
+        partitions = {
+            TopicPartition(topic, partition)
+            for topic in topics
+            for partition in self.consumer.partitions_for_topic(topic) or ()
+        }
+        new_partitions = sorted(partitions - assigned)
+
+        if new_partitions:
+            # Assigning replaces the whole assignment and its positions.
+            positions = {
+                partition: await self.consumer.position(partition)
+                for partition in assigned
+            }
+            self.consumer.assign([*sorted(assigned), *new_partitions])
+
+            for partition, offset in positions.items():
+                self.consumer.seek(partition, offset)
+
+            await self._seek_new_partitions(new_partitions, latest=latest)
+
+        return all(self.consumer.partitions_for_topic(topic) for topic in topics)
+
+    async def _refresh_metadata(self, topics: list[str]):
+        # A missing topic is created by the first producer that writes to it.
+        await refresh_topics_metadata(self.consumer, topics)
+
+    async def _seek_new_partitions(
+        self,
+        partitions: list[TopicPartition],
+        latest: bool,
+    ):
+        stored_offsets = {}
+
+        if self.offsets_store is not None:
+            stored_offsets = await self.offsets_store.get_offsets(
+                instance_id=self.instance_id,
+                partitions=partitions,
+            )
+
+        for partition, offset in stored_offsets.items():
+            self.consumer.seek(partition, offset)
+
+        unknown_partitions = [
+            partition for partition in partitions if partition not in stored_offsets
+        ]
+
+        if not unknown_partitions:
+            return
+
+        if latest:
+            await self.consumer.seek_to_end(*unknown_partitions)
+        else:
+            await self.consumer.seek_to_beginning(*unknown_partitions)
+
+    async def _save_offsets(self, offsets: dict[TopicPartition, int]):
+        if self.broadcast and self.offsets_store is not None:
+            await self.offsets_store.save_offsets(
+                instance_id=self.instance_id,
+                offsets=offsets,
+            )
+
+    async def start_consuming_batches(
+        self,
+        topics: list[str],
+        max_records: int,
+        timeout_ms: int,
+    ) -> AsyncIterator[list[BrokerRecord]]:
+        loop = asyncio.get_running_loop()
+        backoff = self.metadata_retry_backoff_ms / 1000
+        subscribed = await self._subscribe(topics=topics)
+        checked_at = loop.time()
+
+        while True:
+            # Topics created after the consumer started are picked up
+            # between polls, the existing ones are consumed meanwhile.
+            if not subscribed and loop.time() - checked_at >= backoff:
+                subscribed = await self._assign_new_partitions(topics, latest=False)
+                checked_at = loop.time()
 
-    async def send_message(self, key: bytes, topic: str, value: bytes):
-        await self.producer.send_and_wait(key=key, topic=topic, value=value)
+            if self.broadcast and not self.consumer.assignment():
+                # None of the topics exists yet, there is nothing to poll.
+                await asyncio.sleep(backoff)
+                continue
 
-    async def start_consuming(self, topic: str) -> AsyncIterator[dict]:
-        self.consumer.subscribe(topics=[topic])
+            partitions = await self.consumer.getmany(
+                timeout_ms=timeout_ms,
+                max_records=max_records,
+            )
+            records = [
+                BrokerRecord(topic=message.topic, key=message.key, value=message.value)
+                for messages in partitions.values()
+                for message in messages
+            ]
 
-        async for message in self.consumer:
-            yield orjson.loads(message.value)
+            if records:
+                yield records
+                await self._save_offsets(
+                    {
+                        partition: messages[-1].offset + 1
+                        for partition, messages in partitions.items()
+                        if messages
+                    },
+                )
 
     async def stop_consuming(self):
         self.consumer.unsubscribe()
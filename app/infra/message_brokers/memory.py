@@ -0,0 +1,69 @@
+import asyncio
+from collections.abc import AsyncIterator
+from dataclasses import (
+    dataclass,
+    field,
+)
+
+from app.infra.message_brokers.base import BaseMessageBroker
+from app.infra.message_brokers.dtos import BrokerRecord
+
+
+@dataclass(eq=False)
+class MemoryMessageBroker(BaseMessageBroker):
+    """Delivers messages to the consumers of this process only.
+
+    Like a broadcast Kafka consumer, a consumer receives the messages sent
+    after it subscribed. Meant for a single node without Kafka.
+    """
+
+    _subscriptions: list[tuple[frozenset[str], asyncio.Queue[BrokerRecord]]] = field(
+        default_factory=list, kw_only=True
+    )
+
+    async def start(self): ...
+
+    async def close(self):
+        self._subscriptions.clear()
+
+    async def send_message(self, key: bytes, topic: str, value: bytes):
+        record = BrokerRecord(topic=topic, key=key, value=value)
+
+        for topics, queue in self._subscriptions:
+            if topic in topics:
+                queue.put_nowait(record)
+
+    async def send_messages(
+        self,
+        topic: str,
+        messages: list[tuple[bytes | None, bytes]],
+    ):
+        for key, value in messages:
+            await self.send_message(key=key, topic=topic, value=value)
+
+    async def flush(self): ...
+
+    async def start_consuming_batches(
+        self,
+        topics: list[str],
+        max_records: int,
+        timeout_ms: int,
+    ) -> AsyncIterator[list[BrokerRecord]]:
+        queue = self._subscribe(topics=topics)
+
+        while True:
+            records = [await queue.get()]
+
+            while len(records) < max_records and not queue.empty():
+                records.append(queue.get_nowait())
+
+            yield records
+
+    async def stop_consuming(self):
+        self._subscriptions.clear()
+
+    def _subscribe(self, topics: list[str]) -> asyncio.Queue[BrokerRecord]:
+        queue = asyncio.Queue()
+        self._subscriptions.append((frozenset(topics), queue))
+
+        return queue
@@ -0,0 +1,93 @@
+from abc import (
+    ABC,
+    abstractmethod,
+)
+from dataclasses import dataclass
+from typing import ClassVar
+
+from aiokafka import TopicPartition
+from pymongo import (
+    ASCENDING,
+    IndexModel,
+    UpdateOne,
+)
+
+from app.infra.repositories.messages.mongo import BaseMongoDBRepository
+
+
+@dataclass
+class BaseOffsetsStore(ABC):
+    @abstractmethod
+    async def get_offsets(
+        self,
+        instance_id: str,
+        partitions: list[TopicPartition],
+    ) -> dict[TopicPartition, int]: ...
+
+    @abstractmethod
+    async def save_offsets(
+        self,
+        instance_id: str,
+        offsets: dict[TopicPartition, int],
+    ) -> None: ...
+
+
+@dataclass
+class MongoDBOffsetsStore(BaseOffsetsStore, BaseMongoDBRepository):
+    indexes: ClassVar[list[IndexModel]] = [
+        IndexModel(
+            [
+                ("instance_id", ASCENDING),
+                ("topic", ASCENDING),
+                ("partition", ASCENDING),
+            ],
+            name="instance_id_topic_partition_unique",
+            unique=True,
+        ),
+    ]
+
+    async def get_offsets(
+        self,
+        instance_id: str,
+        partitions: list[TopicPartition],
+    ) -> dict[TopicPartition, int]:
+        cursor = self._collection.find(
+            {
+                "instance_id": instance_id,
+                "topic": {"$in": list({partition.topic for partition in partitions})},
+            },
+        )
+        stored = {
+            TopicPartition(document["topic"], document["partition"]): document["offset"]
+            async for document in cursor
+        }
+
+        return {
+            partition: stored[partition]
+            for partition in partitions
+            if partition in stored
+        }
+
+    async def save_offsets(
+        self,
+        instance_id: str,
+        offsets: dict[TopicPartition, int],
+    ) -> None:
+        if not offsets:
+            return
+
+        await self._collection.bulk_write(
+            [
+                UpdateOne(
+                    {
+                        "instance_id": instance_id,
+                        "topic": partition.topic,
+                        "partition": partition.partition,
+                    },
+                    {"$set": {"offset": offset}},
+                    upsert=True,
+                )
+                for partition, offset in offsets.items()
+            ],
+            ordered=False,
+        )
@@ -0,0 +1,30 @@
+from base64 import (
+    urlsafe_b64decode,
+    urlsafe_b64encode,
+)
+from binascii import Error as BinasciiError
+from dataclasses import dataclass
+from datetime import datetime
+
+import orjson
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Position of a document in the ``(created_at, oid)`` sort order."""
+
+    created_at: datetime
+    oid: str
+
+    def encode(self) -> str:
+        return urlsafe_b64encode(
+            orjson.dumps([self.created_at.isoformat(), self.oid]),
+        ).decode()
+
+    @classmethod
+    def decode(cls, value: str) -> "Cursor":
+        try:
+            created_at, oid = orjson.loads(urlsafe_b64decode(value.encode()))
+            return cls(created_at=datetime.fromisoformat(created_at), oid=str(oid))
+        except (BinasciiError, orjson.JSONDecodeError, TypeError, ValueError):
+            raise ValueError(f"Invalid cursor: {value!r}")
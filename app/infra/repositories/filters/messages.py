@@ -1,13 +1,28 @@
 from dataclasses import dataclass
+from enum import Enum
+
+from app.infra.repositories.filters.cursors import Cursor
+
+
+class CountMode(str, Enum):
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    NONE = "none"
 
 
 @dataclass
 class GetMessagesFilters:
     limit: int = 10
     offset: int = 0
+    before: Cursor | None = None
+    after: Cursor | None = None
+    count: CountMode = CountMode.ESTIMATED
 
 
 @dataclass
 class GetAllChatsFilters:
     limit: int = 10
     offset: int = 0
+    before: Cursor | None = None
+    after: Cursor | None = None
+    count: CountMode = CountMode.ESTIMATED
@@ -37,7 +37,7 @@ class BaseChatsRepository(ABC):
     async def get_all_chats(
         self,
         filters: GetAllChatsFilters,
-    ) -> tuple[Iterable[Chat], int]: ...
+    ) -> tuple[Iterable[Chat], int | None]: ...
 
     @abstractmethod
     async def add_telegram_listener(self, chat_oid: str, telegram_chat_id: str): ...
@@ -51,9 +51,12 @@ class BaseMessagesRepository(ABC):
     @abstractmethod
     async def add_message(self, message: Message) -> None: ...
 
+    @abstractmethod
+    async def add_messages(self, messages: list[Message]) -> None: ...
+
     @abstractmethod
     async def get_messages(
         self,
         chat_oid: str,
         filters: GetMessagesFilters,
-    ) -> tuple[Iterable[Message], int]: ...
+    ) -> tuple[Iterable[Message], int | None]: ...
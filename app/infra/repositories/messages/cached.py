@@ -0,0 +1,131 @@
+import time
+from collections import OrderedDict
+from dataclasses import (
+    dataclass,
+    field,
+)
+from typing import Iterable
+
+from app.domain.entities.messages import (
+    Chat,
+    ChatListener,
+)
+from app.infra.repositories.filters.messages import GetAllChatsFilters
+from app.infra.repositories.messages.base import BaseChatsRepository
+from app.infra.repositories.messages.converters import copy_chat_entity
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    size: int
+    hits: int
+    negative_hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+
+
+@dataclass
+class CachedChatsRepository(BaseChatsRepository):
+    """Read-through LRU cache of chats looked up by oid.
+
+    Unknown oids are cached as well, for ``negative_ttl`` seconds. Writes
+    made through the repository invalidate the chat right away, changes
+    made on other nodes have to be reported through ``invalidate``.
+    """
+
+    repository: BaseChatsRepository
+    max_size: int = 10_000
+    ttl: float = 60
+    negative_ttl: float = 5
+    _entries: OrderedDict[str, tuple[float, Chat | None]] = field(
+        default_factory=OrderedDict,
+        kw_only=True,
+    )
+    # Bumped on every invalidation, so a lookup that started before it does
+    # not put a stale chat back into the cache.
+    _version: int = field(default=0, kw_only=True)
+    _hits: int = field(default=0, kw_only=True)
+    _negative_hits: int = field(default=0, kw_only=True)
+    _misses: int = field(default=0, kw_only=True)
+    _evictions: int = field(default=0, kw_only=True)
+    _invalidations: int = field(default=0, kw_only=True)
+
+    async def get_chat_by_oid(self, oid: str) -> Chat | None:
+        entry = self._entries.get(oid)
+
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(oid)
+            chat = entry[1]
+
+            if chat is None:
+                self._negative_hits += 1
+                return None
+
+            self._hits += 1
+            return copy_chat_entity(chat)
+
+        self._misses += 1
+        version = self._version
+        chat = await self.repository.get_chat_by_oid(oid=oid)
+
+        if version == self._version:
+            self._store(oid, chat)
+
+        return copy_chat_entity(chat) if chat is not None else None
+
+    async def check_chat_exists_by_oid(self, oid: str) -> bool:
+        return await self.get_chat_by_oid(oid=oid) is not None
+
+    async def check_chat_exists_by_title(self, title: str) -> bool:
+        return await self.repository.check_chat_exists_by_title(title=title)
+
+    async def add_chat(self, chat: Chat) -> None:
+        await self.repository.add_chat(chat)
+        self.invalidate(chat.oid)
+
+    async def delete_chat_by_oid(self, chat_oid: str) -> None:
+        await self.repository.delete_chat_by_oid(chat_oid=chat_oid)
+        self.invalidate(chat_oid)
+
+    async def get_all_chats(
+        self,
+        filters: GetAllChatsFilters,
+    ) -> tuple[Iterable[Chat], int | None]:
+        return await self.repository.get_all_chats(filters=filters)
+
+    async def add_telegram_listener(self, chat_oid: str, telegram_chat_id: str):
+        await self.repository.add_telegram_listener(
+            chat_oid=chat_oid,
+            telegram_chat_id=telegram_chat_id,
+        )
+        self.invalidate(chat_oid)
+
+    async def get_listeners(self, chat_oid: str) -> Iterable[ChatListener]:
+        chat = await self.get_chat_by_oid(oid=chat_oid)
+
+        return list(chat.listeners) if chat is not None else []
+
+    def invalidate(self, oid: str) -> None:
+        self._version += 1
+        self._invalidations += 1
+        self._entries.pop(oid, None)
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            size=len(self._entries),
+            hits=self._hits,
+            negative_hits=self._negative_hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            invalidations=self._invalidations,
+        )
+
+    def _store(self, oid: str, chat: Chat | None):
+        ttl = self.ttl if chat is not None else self.negative_ttl
+        self._entries[oid] = (time.monotonic() + ttl, chat)
+        self._entries.move_to_end(oid)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._evictions += 1
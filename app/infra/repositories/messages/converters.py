@@ -29,6 +29,7 @@ def convert_chat_entity_to_document(chat: Chat) -> dict:
         "oid": chat.oid,
         "title": chat.title.as_generic_type(),
         "created_at": chat.created_at,
+        "messages_count": 0,
     }
 
 
@@ -48,6 +49,18 @@ def convert_chat_listener_document_to_entity(listener_id: str) -> ChatListener:
     )
 
 
+def copy_chat_entity(chat: Chat) -> Chat:
+    # Callers register events and add messages on the chats they get, so
+    # a chat kept by a repository itself is never handed out.
+    return Chat(
+        oid=chat.oid,
+        title=chat.title,
+        created_at=chat.created_at,
+        listeners=set(chat.listeners),
+        is_deleted=chat.is_deleted,
+    )
+
+
 def convert_chat_document_to_entity(chat_document: Mapping[str, Any]) -> Chat:
     return Chat(
         oid=chat_document["oid"],
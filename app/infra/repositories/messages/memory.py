@@ -1,41 +1,173 @@
+from bisect import (
+    bisect_left,
+    bisect_right,
+    insort,
+)
 from dataclasses import (
     dataclass,
     field,
 )
+from datetime import datetime
+from typing import (
+    Iterable,
+    TypeVar,
+)
+
+from app.domain.entities.base import BaseEntity
+from app.domain.entities.messages import (
+    Chat,
+    ChatListener,
+    Message,
+)
+from app.infra.repositories.filters.messages import (
+    CountMode,
+    GetAllChatsFilters,
+    GetMessagesFilters,
+)
+from app.infra.repositories.messages.base import (
+    BaseChatsRepository,
+    BaseMessagesRepository,
+)
+from app.infra.repositories.messages.converters import copy_chat_entity
+
+
+ENT = TypeVar("ENT", bound=BaseEntity)
+SortKey = tuple[datetime, str]
+
+
+def _get_sort_key(entity: BaseEntity) -> SortKey:
+    return entity.created_at, entity.oid
+
 
-from app.domain.entities.messages import Chat
-from app.infra.repositories.messages.base import BaseChatsRepository
+def _insert_sorted(entities: list[ENT], entity: ENT):
+    # New entities are almost always the latest ones, appending keeps the
+    # insert O(1) for them.
+    if not entities or _get_sort_key(entities[-1]) <= _get_sort_key(entity):
+        entities.append(entity)
+    else:
+        insort(entities, entity, key=_get_sort_key)
+
+
+def _find_page(
+    entities: list[ENT],
+    filters: GetMessagesFilters | GetAllChatsFilters,
+) -> list[ENT]:
+    """Slice a page out of entities ordered by ``(created_at, oid)``, with
+    the same cursor semantics as the MongoDB repositories."""
+    start, end = 0, len(entities)
+
+    if filters.after is not None:
+        after = (filters.after.created_at, filters.after.oid)
+        start = bisect_right(entities, after, key=_get_sort_key)
+
+    if filters.before is not None:
+        before = (filters.before.created_at, filters.before.oid)
+        end = bisect_left(entities, before, key=_get_sort_key)
+
+    if filters.before is None and filters.after is None:
+        start += filters.offset
+
+    if filters.before is not None and filters.after is None:
+        return entities[max(start, end - filters.limit) : end]
+
+    return entities[start : min(end, start + filters.limit)]
+
+
+def _count(entities: list, count_mode: CountMode) -> int | None:
+    return None if count_mode is CountMode.NONE else len(entities)
 
 
 @dataclass
 class MemoryChatsRepository(BaseChatsRepository):
-    _saved_chats: list[Chat] = field(default_factory=list, kw_only=True)
+    """Chats kept in process, indexed by oid and title.
+
+    Chats are handed out as copies, like the ones read from MongoDB, so
+    events and messages added by the callers do not pile up here.
+    """
+
+    _chats_by_oid: dict[str, Chat] = field(default_factory=dict, kw_only=True)
+    _oids_by_title: dict[str, str] = field(default_factory=dict, kw_only=True)
+    _sorted_chats: list[Chat] = field(default_factory=list, kw_only=True)
 
     async def get_chat_by_oid(self, oid: str) -> Chat | None:
-        try:
-            return next(chat for chat in self._saved_chats if chat.oid == oid)
-        except StopIteration:
-            return None
+        chat = self._chats_by_oid.get(oid)
+
+        return copy_chat_entity(chat) if chat is not None else None
 
     async def check_chat_exists_by_title(self, title: str) -> bool:
-        try:
-            return bool(
-                next(
-                    chat
-                    for chat in self._saved_chats
-                    if chat.title.as_generic_type() == title
-                ),
-            )
-        except StopIteration:
-            return False
+        return title in self._oids_by_title
+
+    async def check_chat_exists_by_oid(self, oid: str) -> bool:
+        return oid in self._chats_by_oid
 
     async def add_chat(self, chat: Chat) -> None:
-        self._saved_chats.append(chat)
+        chat = copy_chat_entity(chat)
+        self._chats_by_oid[chat.oid] = chat
+        self._oids_by_title[chat.title.as_generic_type()] = chat.oid
+        _insert_sorted(self._sorted_chats, chat)
 
-    async def check_chat_exists_by_oid(self, oid: str) -> bool:
-        try:
-            return bool(
-                next(chat for chat in self._saved_chats if chat.oid == oid),
-            )
-        except StopIteration:
-            return False
+    async def delete_chat_by_oid(self, chat_oid: str) -> None:
+        chat = self._chats_by_oid.pop(chat_oid, None)
+
+        if chat is None:
+            return
+
+        self._oids_by_title.pop(chat.title.as_generic_type(), None)
+        index = bisect_left(
+            self._sorted_chats,
+            _get_sort_key(chat),
+            key=_get_sort_key,
+        )
+        del self._sorted_chats[index]
+
+    async def get_all_chats(
+        self,
+        filters: GetAllChatsFilters,
+    ) -> tuple[Iterable[Chat], int | None]:
+        chats = _find_page(self._sorted_chats, filters=filters)
+
+        return (
+            [copy_chat_entity(chat) for chat in chats],
+            _count(self._sorted_chats, count_mode=filters.count),
+        )
+
+    async def add_telegram_listener(self, chat_oid: str, telegram_chat_id: str):
+        chat = self._chats_by_oid.get(chat_oid)
+
+        if chat is not None:
+            chat.listeners.add(ChatListener(oid=telegram_chat_id))
+
+    async def get_listeners(self, chat_oid: str) -> Iterable[ChatListener]:
+        chat = self._chats_by_oid.get(chat_oid)
+
+        return list(chat.listeners) if chat is not None else []
+
+
+@dataclass
+class MemoryMessagesRepository(BaseMessagesRepository):
+    """Messages kept in process, in one time-ordered list per chat."""
+
+    _messages_by_chat: dict[str, list[Message]] = field(
+        default_factory=dict,
+        kw_only=True,
+    )
+
+    async def add_message(self, message: Message) -> None:
+        messages = self._messages_by_chat.setdefault(message.chat_oid, [])
+        _insert_sorted(messages, message)
+
+    async def add_messages(self, messages: list[Message]) -> None:
+        for message in messages:
+            await self.add_message(message)
+
+    async def get_messages(
+        self,
+        chat_oid: str,
+        filters: GetMessagesFilters,
+    ) -> tuple[Iterable[Message], int | None]:
+        messages = self._messages_by_chat.get(chat_oid, [])
+
+        return (
+            _find_page(messages, filters=filters),
+            _count(messages, count_mode=filters.count),
+        )
@@ -1,15 +1,36 @@
+import asyncio
+import logging
 from abc import ABC
-from dataclasses import dataclass
-from typing import Iterable
+from collections import Counter
+from dataclasses import (
+    dataclass,
+    field,
+)
+from typing import (
+    Any,
+    ClassVar,
+    Iterable,
+    Mapping,
+)
 
 from motor.core import AgnosticClient
+from pymongo import (
+    ASCENDING,
+    DESCENDING,
+    IndexModel,
+    UpdateOne,
+    WriteConcern,
+)
+from pymongo.errors import BulkWriteError
 
 from app.domain.entities.messages import (
     Chat,
     Message,
     ChatListener,
 )
+from app.infra.repositories.filters.cursors import Cursor
 from app.infra.repositories.filters.messages import (
+    CountMode,
     GetMessagesFilters,
     GetAllChatsFilters,
 )
@@ -26,19 +47,104 @@ from app.infra.repositories.messages.converters import (
 )
 
 
+logger = logging.getLogger(__name__)
+
+
+def _build_cursor_condition(cursor: Cursor, operator: str) -> dict:
+    return {
+        "$or": [
+            {"created_at": {operator: cursor.created_at}},
+            {"created_at": cursor.created_at, "oid": {operator: cursor.oid}},
+        ],
+    }
+
+
 @dataclass
 class BaseMongoDBRepository(ABC):
     mongo_db_client: AgnosticClient
     mongo_db_name: str
     mongo_db_collection_name: str
 
+    indexes: ClassVar[list[IndexModel]] = []
+
     @property
     def _collection(self):
         return self.mongo_db_client[self.mongo_db_name][self.mongo_db_collection_name]
 
+    async def ensure_indexes(self) -> None:
+        if self.indexes:
+            await self._collection.create_indexes(self.indexes)
+
+    async def get_missing_indexes(self) -> list[IndexModel]:
+        existing_indexes = await self._collection.index_information()
+
+        return [
+            index
+            for index in self.indexes
+            if index.document["name"] not in existing_indexes
+        ]
+
+    async def _find_page(
+        self,
+        find: dict,
+        filters: GetMessagesFilters | GetAllChatsFilters,
+    ) -> list[Mapping[str, Any]]:
+        """Read a page ordered by ``(created_at, oid)``.
+
+        With a ``before`` or ``after`` cursor the page starts right at the
+        cursor through the index instead of skipping ``offset`` documents.
+        """
+        conditions = [find] if find else []
+
+        if filters.after is not None:
+            conditions.append(_build_cursor_condition(filters.after, "$gt"))
+
+        if filters.before is not None:
+            conditions.append(_build_cursor_condition(filters.before, "$lt"))
+
+        # Pages before a cursor are read backwards from it and reversed.
+        backwards = filters.before is not None and filters.after is None
+        direction = DESCENDING if backwards else ASCENDING
+
+        if len(conditions) > 1:
+            query = {"$and": conditions}
+        elif conditions:
+            query = conditions[0]
+        else:
+            query = {}
+
+        cursor = self._collection.find(query).sort(
+            [("created_at", direction), ("oid", direction)],
+        )
+
+        if filters.before is None and filters.after is None:
+            cursor = cursor.skip(filters.offset)
+
+        documents = await cursor.limit(filters.limit).to_list(length=filters.limit)
+
+        if backwards:
+            documents.reverse()
+
+        return documents
+
 
 @dataclass
 class MongoDBChatsRepository(BaseChatsRepository, BaseMongoDBRepository):
+    indexes: ClassVar[list[IndexModel]] = [
+        IndexModel([("oid", ASCENDING)], name="oid_unique", unique=True),
+        # Chats upserted by add_telegram_listener have no title.
+        IndexModel(
+            [("title", ASCENDING)],
+            name="title_unique",
+            unique=True,
+            sparse=True,
+        ),
+        IndexModel(
+            [("created_at", ASCENDING), ("oid", ASCENDING)],
+            name="created_at_oid",
+        ),
+    ]
+
     async def check_chat_exists_by_oid(self, oid: str) -> bool:
         return bool(
             await self._collection.find_one(
@@ -70,16 +176,26 @@ class MongoDBChatsRepository(BaseChatsRepository, BaseMongoDBRepository):
     async def get_all_chats(
         self,
         filters: GetAllChatsFilters,
-    ) -> tuple[Iterable[Chat], int]:
-        cursor = self._collection.find().skip(filters.offset).limit(filters.limit)
-        count = await self._collection.count_documents({})
+    ) -> tuple[Iterable[Chat], int | None]:
+        chat_documents = await self._find_page(find={}, filters=filters)
+        count = await self._count_chats(filters.count)
         chats = [
             convert_chat_document_to_entity(chat_document=chat_document)
-            async for chat_document in cursor
+            for chat_document in chat_documents
         ]
 
         return chats, count
 
+    async def _count_chats(self, count_mode: CountMode) -> int | None:
+        if count_mode is CountMode.EXACT:
+            return await self._collection.count_documents({})
+
+        if count_mode is CountMode.ESTIMATED:
+            # Taken from the collection metadata, no documents are scanned.
+            return await self._collection.estimated_document_count()
+
+        return None
+
     async def add_telegram_listener(self, chat_oid: str, telegram_chat_id: str):
         await self._collection.update_one(
             {"oid": chat_oid},
@@ -96,24 +212,260 @@ class MongoDBChatsRepository(BaseChatsRepository, BaseMongoDBRepository):
         ]
 
 
+@dataclass(frozen=True)
+class GroupCommitStats:
+    flushes: int
+    documents: int
+    max_batch_size: int
+    last_batch_size: int
+
+    @property
+    def average_batch_size(self) -> float:
+        return self.documents / self.flushes if self.flushes else 0
+
+
 @dataclass
 class MongoDBMessagesRepository(BaseMessagesRepository, BaseMongoDBRepository):
+    """Messages repository that also keeps ``messages_count`` of the chat
+    documents up to date.
+
+    With ``group_commit`` enabled ``add_message`` does not insert right
+    away, concurrent messages are collected for up to
+    ``group_commit_max_delay`` seconds or ``group_commit_max_batch_size``
+    documents and written with one unordered ``insert_many``. Every caller
+    still returns only after its own document has been acknowledged.
+    """
+
+    mongo_db_chats_collection_name: str
+    group_commit: bool = field(default=False, kw_only=True)
+    group_commit_max_delay: float = field(default=0.005, kw_only=True)
+    group_commit_max_batch_size: int = field(default=500, kw_only=True)
+    write_concern: WriteConcern | None = field(default=None, kw_only=True)
+    _pending: list[tuple[Message, asyncio.Future]] = field(
+        default_factory=list,
+        kw_only=True,
+    )
+    _flush_timer: asyncio.TimerHandle | None = field(default=None, kw_only=True)
+    _flush_tasks: set[asyncio.Task] = field(default_factory=set, kw_only=True)
+    _flushes: int = field(default=0, kw_only=True)
+    _flushed_documents: int = field(default=0, kw_only=True)
+    _max_batch_size: int = field(default=0, kw_only=True)
+    _last_batch_size: int = field(default=0, kw_only=True)
+
+    indexes: ClassVar[list[IndexModel]] = [
+        IndexModel(
+            [("chat_oid", ASCENDING), ("created_at", ASCENDING), ("oid", ASCENDING)],
+            name="chat_oid_created_at_oid",
+        ),
+    ]
+
+    @property
+    def _chats_collection(self):
+        return self.mongo_db_client[self.mongo_db_name][
+            self.mongo_db_chats_collection_name
+        ]
+
     async def add_message(self, message: Message) -> None:
+        if self.group_commit:
+            await self._add_message_to_group(message)
+            return
+
         await self._collection.insert_one(
             document=convert_message_entity_to_document(message),
         )
+        await self._chats_collection.update_one(
+            {"oid": message.chat_oid},
+            {"$inc": {"messages_count": 1}},
+        )
+
+    async def add_messages(self, messages: list[Message]) -> None:
+        if not messages:
+            return
+
+        await self._collection.insert_many(
+            [convert_message_entity_to_document(message) for message in messages],
+        )
+        await self._increment_messages_counts(self._chats_collection, messages)
+
+    async def flush(self):
+        """Write the collected messages now and wait for all group
+        writes in progress."""
+        self._flush_group()
+
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+
+    def group_commit_stats(self) -> GroupCommitStats:
+        return GroupCommitStats(
+            flushes=self._flushes,
+            documents=self._flushed_documents,
+            max_batch_size=self._max_batch_size,
+            last_batch_size=self._last_batch_size,
+        )
+
+    async def _add_message_to_group(self, message: Message):
+        loop = asyncio.get_running_loop()
+        acknowledged = loop.create_future()
+        self._pending.append((message, acknowledged))
+
+        if len(self._pending) >= self.group_commit_max_batch_size:
+            self._flush_group()
+        elif self._flush_timer is None:
+            self._flush_timer = loop.call_later(
+                self.group_commit_max_delay,
+                self._flush_group,
+            )
+
+        # The document is written even if the caller goes away meanwhile.
+        await asyncio.shield(acknowledged)
+
+    def _flush_group(self):
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        task = asyncio.create_task(self._write_group(batch))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _write_group(self, batch: list[tuple[Message, asyncio.Future]]):
+        messages = [message for message, _ in batch]
+        failures: dict[int, BaseException] = {}
+        collection = self._collection
+        chats_collection = self._chats_collection
+
+        if self.write_concern is not None:
+            collection = collection.with_options(write_concern=self.write_concern)
+            chats_collection = chats_collection.with_options(
+                write_concern=self.write_concern,
+            )
+
+        try:
+            await collection.insert_many(
+                [convert_message_entity_to_document(message) for message in messages],
+                ordered=False,
+            )
+        except BulkWriteError as error:
+            # Unordered, so everything but the reported documents is written.
+            for write_error in error.details["writeErrors"]:
+                failures[write_error["index"]] = BulkWriteError(
+                    {"writeErrors": [write_error]},
+                )
+        except Exception as error:
+            failures = dict.fromkeys(range(len(batch)), error)
+
+        written = [
+            message for index, message in enumerate(messages) if index not in failures
+        ]
+
+        if written:
+            try:
+                await self._increment_messages_counts(chats_collection, written)
+            except Exception:
+                # The messages are stored, the counters are fixed up by
+                # reconcile_messages_counts.
+                logger.exception("Failed to update messages counts of the chats")
+
+        self._flushes += 1
+        self._flushed_documents += len(written)
+        self._last_batch_size = len(batch)
+        self._max_batch_size = max(self._max_batch_size, len(batch))
+
+        for index, (_, acknowledged) in enumerate(batch):
+            if acknowledged.done():
+                continue
+
+            if index in failures:
+                acknowledged.set_exception(failures[index])
+            else:
+                acknowledged.set_result(None)
+
+    @staticmethod
+    async def _increment_messages_counts(chats_collection, messages: list[Message]):
+        await chats_collection.bulk_write(
+            [
+                UpdateOne({"oid": chat_oid}, {"$inc": {"messages_count": count}})
+                for chat_oid, count in Counter(
+                    message.chat_oid for message in messages
+                ).items()
+            ],
+            ordered=False,
+        )
 
     async def get_messages(
         self,
         chat_oid: str,
         filters: GetMessagesFilters,
-    ) -> tuple[Iterable[Message], int]:
+    ) -> tuple[Iterable[Message], int | None]:
         find = {"chat_oid": chat_oid}
-        cursor = self._collection.find(find).skip(filters.offset).limit(filters.limit)
-        count = await self._collection.count_documents(filter=find)
+        message_documents = await self._find_page(find=find, filters=filters)
+        count = await self._count_messages(chat_oid=chat_oid, count_mode=filters.count)
         messages = [
             convert_message_document_to_entity(message_document=message_document)
-            async for message_document in cursor
+            for message_document in message_documents
         ]
 
         return messages, count
+
+    async def _count_messages(self, chat_oid: str, count_mode: CountMode) -> int | None:
+        if count_mode is CountMode.NONE:
+            return None
+
+        if count_mode is CountMode.ESTIMATED:
+            chat_document = await self._chats_collection.find_one(
+                {"oid": chat_oid},
+                projection={"messages_count": True},
+            )
+
+            # Chats created before the counter existed fall back to counting
+            # until reconcile_messages_counts has been run.
+            if chat_document and "messages_count" in chat_document:
+                return chat_document["messages_count"]
+
+        return await self._collection.count_documents(filter={"chat_oid": chat_oid})
+
+    async def reconcile_messages_counts(self) -> int:
+        """Recount the messages of every chat and store the result in its
+        ``messages_count``.
+
+        Messages added while the job runs may be counted twice or not at
+        all, the job is meant to repair drift and can be run again.
+        Returns the number of updated chats.
+        """
+        updated_count = 0
+        requests = []
+
+        async for group in self._collection.aggregate(
+            [{"$group": {"_id": "$chat_oid", "count": {"$sum": 1}}}],
+        ):
+            requests.append(
+                UpdateOne(
+                    {"oid": group["_id"], "messages_count": {"$ne": group["count"]}},
+                    {"$set": {"messages_count": group["count"]}},
+                ),
+            )
+
+            if len(requests) >= 1000:
+                result = await self._chats_collection.bulk_write(
+                    requests,
+                    ordered=False,
+                )
+                updated_count += result.modified_count
+                requests = []
+
+        if requests:
+            result = await self._chats_collection.bulk_write(requests, ordered=False)
+            updated_count += result.modified_count
+
+        # Messages are never deleted on their own, so the only chats left
+        # without a counter at this point are the ones without messages.
+        result = await self._chats_collection.update_many(
+            {"messages_count": {"$exists": False}},
+            {"$set": {"messages_count": 0}},
+        )
+
+        return updated_count + result.modified_count
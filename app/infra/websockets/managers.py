@@ -3,28 +3,132 @@ from abc import (
     ABC,
     abstractmethod,
 )
-from collections import defaultdict
+from collections import (
+    deque,
+    OrderedDict,
+)
 from dataclasses import (
     dataclass,
     field,
 )
+from enum import Enum
+from uuid import uuid4
+
+from fastapi import (
+    status,
+    WebSocket,
+)
+
+import orjson
+
+
+# Sent as a text frame, like the JSON notice sent before.
+CHAT_DELETED_FRAME = orjson.dumps({"message": "Chat has been deleted."}).decode()
+
+
+class OverflowPolicy(str, Enum):
+    DROP_OLDEST = "drop_oldest"
+    DISCONNECT = "disconnect"
+
+
+@dataclass(eq=False)
+class WebSocketSender:
+    """Outbound queue and writer task of a single websocket connection."""
+
+    websocket: WebSocket
+    queue: asyncio.Queue[bytes]
+    task: asyncio.Task | None = None
+
+    def enqueue(self, bytes_: bytes, overflow_policy: OverflowPolicy) -> bool:
+        """Put a frame into the queue without waiting.
+
+        Returns ``False`` when the queue is full and the connection has
+        to be evicted according to the overflow policy.
+        """
+        try:
+            self.queue.put_nowait(bytes_)
+        except asyncio.QueueFull:
+            if overflow_policy is OverflowPolicy.DISCONNECT:
+                return False
+
+            self.queue.get_nowait()
+            self.queue.put_nowait(bytes_)
+
+        return True
+
+    async def run(self):
+        while True:
+            bytes_ = await self.queue.get()
+            await self.websocket.send_bytes(bytes_)
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+
 
-from fastapi import WebSocket
+@dataclass(eq=False)
+class ReplayBuffer:
+    """Sequence counter of a chat and its most recent frames."""
+
+    frames: deque[tuple[int, bytes]]
+    seq: int = 0
+
+    def add(self, bytes_: bytes, epoch: str) -> bytes:
+        self.seq += 1
+        frame = _add_sequence(bytes_, seq=self.seq, epoch=epoch)
+        self.frames.append((self.seq, frame))
+
+        return frame
+
+    def get_frames_since(self, seq: int) -> list[bytes] | None:
+        """Return the frames after ``seq``, or ``None`` when some of them
+        are no longer buffered."""
+        if seq > self.seq:
+            return None
+
+        if seq == self.seq:
+            return []
+
+        if not self.frames or self.frames[0][0] > seq + 1:
+            return None
+
+        return [frame for frame_seq, frame in self.frames if frame_seq > seq]
+
+
+def _add_sequence(bytes_: bytes, seq: int, epoch: str) -> bytes:
+    # Splices the fields into JSON object frames without decoding them,
+    # anything else is passed on untouched.
+    if not bytes_.startswith(b"{"):
+        return bytes_
+
+    header = b'{"seq":%d,"epoch":"%s"' % (seq, epoch.encode())
+    body = bytes_[1:].lstrip()
+
+    return header + (body if body.startswith(b"}") else b"," + body)
 
 
 @dataclass
 class BaseConnectionManager(ABC):
-    connections_map: dict[str, list[WebSocket]] = field(
-        default_factory=lambda: defaultdict(list),
+    connections_map: dict[str, set[WebSocket]] = field(
+        default_factory=dict,
         kw_only=True,
     )
 
     @abstractmethod
-    async def accept_connection(self, websocket: WebSocket, key: str): ...
+    async def accept_connection(
+        self,
+        websocket: WebSocket,
+        key: str,
+        since: int | None = None,
+        epoch: str | None = None,
+    ): ...
 
     @abstractmethod
     async def remove_connection(self, websocket: WebSocket, key: str): ...
 
+    @abstractmethod
+    async def send(self, websocket: WebSocket, key: str, bytes_: bytes): ...
+
     @abstractmethod
     async def send_all(self, key: str, bytes_: bytes): ...
 
@@ -34,36 +138,216 @@ class BaseConnectionManager(ABC):
 
 @dataclass
 class ConnectionManager(BaseConnectionManager):
-    lock_map: dict[str, asyncio.Lock] = field(default_factory=dict)
+    """Registry of the websocket connections of every chat.
+
+    Registering and dropping a connection never awaits, so on a single
+    event loop no locks are needed. A chat is removed from the registry
+    together with its last connection.
+    """
+
+    senders_map: dict[WebSocket, WebSocketSender] = field(default_factory=dict)
+    send_queue_size: int = field(default=100, kw_only=True)
+    overflow_policy: OverflowPolicy = field(
+        default=OverflowPolicy.DROP_OLDEST,
+        kw_only=True,
+    )
+    close_timeout: float = field(default=1, kw_only=True)
+    replay_buffer_size: int = field(default=100, kw_only=True)
+    max_replay_buffers: int = field(default=10_000, kw_only=True)
+    # Sequence numbers only mean something within one process, a client
+    # reconnecting to another node or after a restart has to resync.
+    epoch: str = field(default_factory=lambda: uuid4().hex[:8], kw_only=True)
+    replay_buffers: OrderedDict[str, ReplayBuffer] = field(
+        default_factory=OrderedDict,
+        kw_only=True,
+    )
+    # New buffers continue above every evicted one, so a chat whose buffer
+    # was dropped never hands out a sequence number twice.
+    _evicted_seq: int = field(default=0, kw_only=True)
+    _background_tasks: set[asyncio.Task] = field(default_factory=set, kw_only=True)
+
+    async def accept_connection(
+        self,
+        websocket: WebSocket,
+        key: str,
+        since: int | None = None,
+        epoch: str | None = None,
+    ):
+        """Register the connection, replaying the frames after ``since``
+        when the client reconnects.
 
-    async def accept_connection(self, websocket: WebSocket, key: str):
+        If the frames cannot be replayed, the client gets a
+        ``{"resync": true, ...}`` frame and has to reload the history.
+        """
         await websocket.accept()
 
-        if key not in self.lock_map:
-            self.lock_map[key] = asyncio.Lock()
+        # Nothing is awaited from reading the buffer until the sender is
+        # registered, so no frame is missed or sent twice.
+        initial_frames = self._get_missed_frames(key=key, since=since, epoch=epoch)
+        connections = self.connections_map.get(key)
+
+        if connections is None:
+            connections = self.connections_map[key] = set()
 
-        async with self.lock_map[key]:
-            self.connections_map[key].append(websocket)
+        connections.add(websocket)
+        self._start_sender(
+            websocket=websocket,
+            key=key,
+            initial_frames=initial_frames,
+        )
 
     async def remove_connection(self, websocket: WebSocket, key: str):
-        async with self.lock_map[key]:
-            self.connections_map[key].remove(websocket)
+        self._discard_connection(websocket=websocket, key=key)
+
+    async def send(self, websocket: WebSocket, key: str, bytes_: bytes):
+        """Queue a frame meant for this connection only, it is neither
+        numbered nor replayed."""
+        sender = self.senders_map.get(websocket)
+
+        if sender is None:
+            return
+
+        if not sender.enqueue(bytes_, overflow_policy=self.overflow_policy):
+            self._evict_connection(websocket=websocket, key=key)
 
     async def send_all(self, key: str, bytes_: bytes):
-        for websocket in self.connections_map[key]:
-            await websocket.send_bytes(bytes_)
+        bytes_ = self._get_replay_buffer(key).add(bytes_, epoch=self.epoch)
+        overflowed = []
+
+        for websocket in self.connections_map.get(key, ()):
+            sender = self.senders_map.get(websocket)
+
+            if sender is None:
+                continue
+
+            if not sender.enqueue(bytes_, overflow_policy=self.overflow_policy):
+                overflowed.append(websocket)
+
+        # Evicted after the loop, the room cannot change while iterating.
+        for websocket in overflowed:
+            self._evict_connection(websocket=websocket, key=key)
 
     async def disconnect_all(self, key: str):
-        lock = self.lock_map.get(key)
+        """Notify and close every connection of the chat at once.
+
+        The chat is dropped before anything is awaited, so broadcasts made
+        meanwhile reach nobody. A peer that does not respond within
+        ``close_timeout`` is left behind.
+        """
+        self.replay_buffers.pop(key, None)
+        connections = self.connections_map.pop(key, ())
+
+        for websocket in connections:
+            sender = self.senders_map.pop(websocket, None)
+
+            if sender is not None:
+                sender.stop()
+
+        await asyncio.gather(
+            *(self._close_connection(websocket) for websocket in connections),
+            return_exceptions=True,
+        )
+
+    def _get_replay_buffer(self, key: str) -> ReplayBuffer:
+        buffer = self.replay_buffers.get(key)
+
+        if buffer is None:
+            buffer = self.replay_buffers[key] = ReplayBuffer(
+                frames=deque(maxlen=self.replay_buffer_size),
+                seq=self._evicted_seq,
+            )
+
+            # Buffers of chats nobody is connected to are kept for
+            # reconnects, the least recently used ones are dropped first.
+            while len(self.replay_buffers) > self.max_replay_buffers:
+                _, evicted = self.replay_buffers.popitem(last=False)
+                self._evicted_seq = max(self._evicted_seq, evicted.seq)
+        else:
+            self.replay_buffers.move_to_end(key)
 
-        if lock is None:
+        return buffer
+
+    def _get_missed_frames(
+        self,
+        key: str,
+        since: int | None,
+        epoch: str | None,
+    ) -> list[bytes]:
+        if since is None:
+            return []
+
+        buffer = self.replay_buffers.get(key)
+        seq = buffer.seq if buffer is not None else 0
+        frames = None
+
+        if epoch == self.epoch and buffer is not None:
+            frames = buffer.get_frames_since(since)
+
+        if frames is None:
+            return [
+                orjson.dumps({"resync": True, "seq": seq, "epoch": self.epoch}),
+            ]
+
+        return frames
+
+    def _start_sender(
+        self,
+        websocket: WebSocket,
+        key: str,
+        initial_frames: list[bytes] = (),
+    ):
+        # Room for the replayed frames on top of the regular backlog.
+        queue = asyncio.Queue(maxsize=self.send_queue_size + len(initial_frames))
+        for frame in initial_frames:
+            queue.put_nowait(frame)
+
+        sender = WebSocketSender(websocket=websocket, queue=queue)
+        sender.task = asyncio.create_task(sender.run())
+        sender.task.add_done_callback(
+            lambda task: self._on_sender_done(task, websocket=websocket, key=key),
+        )
+        self.senders_map[websocket] = sender
+
+    def _on_sender_done(self, task: asyncio.Task, websocket: WebSocket, key: str):
+        # A writer only stops on its own when the socket is gone, so the
+        # connection is dropped here instead of waiting for the reader side.
+        if not task.cancelled():
+            task.exception()
+            self._discard_connection(websocket=websocket, key=key)
+
+    def _discard_connection(self, websocket: WebSocket, key: str):
+        sender = self.senders_map.pop(websocket, None)
+
+        if sender is not None:
+            sender.stop()
+
+        connections = self.connections_map.get(key)
+
+        if connections is None:
             return
 
-        async with self.lock_map[key]:
-            for websocket in self.connections_map[key]:
-                await websocket.send_json(
-                    {
-                        "message": "Chat has been deleted.",
-                    },
-                )
-                await websocket.close()
+        connections.discard(websocket)
+
+        if not connections:
+            del self.connections_map[key]
+
+    async def _close_connection(self, websocket: WebSocket):
+        async with asyncio.timeout(self.close_timeout):
+            await websocket.send_text(CHAT_DELETED_FRAME)
+            await websocket.close()
+
+    def _evict_connection(self, websocket: WebSocket, key: str):
+        self._discard_connection(websocket=websocket, key=key)
+
+        task = asyncio.create_task(
+            websocket.close(code=status.WS_1008_POLICY_VIOLATION),
+        )
+        self._background_tasks.add(task)
+        task.add_done_callback(self._on_background_task_done)
+
+    def _on_background_task_done(self, task: asyncio.Task):
+        self._background_tasks.discard(task)
+
+        if not task.cancelled():
+            # The peer may already be gone, there is nobody left to report to.
+            task.exception()
@@ -5,6 +5,7 @@ from app.domain.entities.messages import (
     Message,
     ChatListener,
 )
+from app.domain.exceptions.base import ApplicationException
 from app.domain.values.messages import (
     Text,
     Title,
@@ -40,7 +41,7 @@ class CreateChatCommandHandler(CommandHandler[CreateChatCommand, Chat]):
 
         new_chat = Chat.create_chat(title=title)
         await self.chat_repository.add_chat(new_chat)
-        await self._mediator.publish(new_chat.pull_events())
+        await self._mediator.publish(new_chat.pull_events(), background=True)
 
         return new_chat
 
@@ -72,10 +73,68 @@ class CreateMessageCommandHandler(CommandHandler[CreateMessageCommand, Chat]):
         await self.message_repository.add_message(
             message=message,
         )
-        await self._mediator.publish(chat.pull_events())
+        await self._mediator.publish(chat.pull_events(), background=True)
         return message
 
 
+@dataclass(frozen=True)
+class CreateMessagesCommandItem:
+    text: str
+    source: str = "web"
+
+
+@dataclass(frozen=True)
+class CreateMessagesCommand(BaseCommand):
+    chat_oid: str
+    messages: list[CreateMessagesCommandItem]
+
+
+@dataclass(frozen=True)
+class CreateMessagesCommandHandler(
+    CommandHandler[CreateMessagesCommand, list[Message | ApplicationException]],
+):
+    chat_repository: BaseChatsRepository
+    message_repository: BaseMessagesRepository
+
+    async def handle(
+        self,
+        command: CreateMessagesCommand,
+    ) -> list[Message | ApplicationException]:
+        """Add all valid messages to the chat at once.
+
+        Returns the created message or the validation error for every
+        item, in the order of the command.
+        """
+        chat = await self.chat_repository.get_chat_by_oid(oid=command.chat_oid)
+
+        if not chat:
+            raise ChatNotFoundException(chat_oid=command.chat_oid)
+
+        results = []
+        messages = []
+        for item in command.messages:
+            try:
+                text = Text(value=item.text)
+            except ApplicationException as exception:
+                results.append(exception)
+                continue
+
+            message = Message(
+                text=text,
+                source=item.source,
+                chat_oid=command.chat_oid,
+            )
+            chat.add_message(message)
+            messages.append(message)
+            results.append(message)
+
+        if messages:
+            await self.message_repository.add_messages(messages=messages)
+            await self._mediator.publish_batch(chat.pull_events(), background=True)
+
+        return results
+
+
 @dataclass(frozen=True)
 class DeleteChatCommand(BaseCommand):
     chat_oid: str
@@ -93,7 +152,7 @@ class DeleteChatCommandHandler(CommandHandler[DeleteChatCommand, None]):
 
         await self.chat_repository.delete_chat_by_oid(chat_oid=command.chat_oid)
         chat.delete()
-        await self._mediator.publish(chat.pull_events())
+        await self._mediator.publish(chat.pull_events(), background=True)
 
 
 @dataclass(frozen=True)
@@ -121,5 +180,5 @@ class AddTelegramListenerCommandHandler(
             chat_oid=command.chat_oid,
             telegram_chat_id=command.telegram_chat_id,
         )
-        await self._mediator.publish(chat.pull_events())
+        await self._mediator.publish(chat.pull_events(), background=True)
         return listener
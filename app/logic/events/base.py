@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import (
     Any,
+    ClassVar,
     Generic,
     TypeVar,
 )
@@ -14,15 +15,27 @@ ET = TypeVar("ET", bound=BaseEvent)
 ER = TypeVar("ER", bound=Any)
 
 
-@dataclass
+@dataclass(slots=True)
 class IntegrationEvent(BaseEvent, ABC): ...
 
 
 @dataclass
 class EventHandler(ABC, Generic[ET, ER]):
+    # Synchronous handlers always run before publish returns, even when
+    # the rest is handed over to the background dispatcher.
+    synchronous: ClassVar[bool] = False
+    # Order-sensitive handlers run one after another in registration order
+    # when the handlers of an event are run concurrently.
+    order_sensitive: ClassVar[bool] = False
+
     message_broker: BaseMessageBroker
     connection_manager: BaseConnectionManager
     broker_topic: str | None = None
 
     @abstractmethod
     def handle(self, event: ET) -> ER: ...
+
+    async def handle_batch(self, events: list[ET]) -> list[ER]:
+        """Handle events of the same type at once, handlers that can do
+        it cheaper than one by one override this."""
+        return [await self.handle(event=event) for event in events]
@@ -0,0 +1,216 @@
+import asyncio
+import logging
+import time
+from collections.abc import (
+    Awaitable,
+    Callable,
+    Iterable,
+)
+from dataclasses import (
+    dataclass,
+    field,
+)
+from typing import Any
+from zlib import crc32
+
+from aiojobs import Scheduler
+
+from app.domain.events.base import BaseEvent
+from app.logic.events.base import EventHandler
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class EventWorkerStats:
+    index: int
+    queue_depth: int
+    processed: int
+    lag: float
+
+
+@dataclass(eq=False)
+class EventWorker:
+    index: int
+    queue: asyncio.Queue[tuple[float, BaseEvent]]
+    processed: int = 0
+    lag: float = 0
+    task: asyncio.Task | None = None
+
+    async def run(self, handler: Callable[[Iterable[BaseEvent]], Awaitable[Any]]):
+        while True:
+            items = [await self.queue.get()]
+
+            while not self.queue.empty():
+                items.append(self.queue.get_nowait())
+
+            # Time the oldest event of the drained chunk spent in the queue.
+            self.lag = time.monotonic() - items[0][0]
+
+            try:
+                await handler([event for _, event in items])
+            except Exception:
+                logger.exception("Worker %s failed to handle events", self.index)
+
+            self.processed += len(items)
+
+    def stats(self) -> EventWorkerStats:
+        return EventWorkerStats(
+            index=self.index,
+            queue_depth=self.queue.qsize(),
+            processed=self.processed,
+            lag=self.lag,
+        )
+
+
+@dataclass(eq=False)
+class PartitionedEventDispatcher:
+    """Spreads events over a fixed set of workers by hashing their key.
+
+    Events with the same key always land on the same worker and are
+    handled in the order they were dispatched, while events with
+    different keys are handled concurrently.
+    """
+
+    handler: Callable[[Iterable[BaseEvent]], Awaitable[Any]]
+    workers_count: int = 8
+    queue_size: int = 100
+    _workers: list[EventWorker] = field(default_factory=list, kw_only=True)
+
+    def start(self):
+        for index in range(self.workers_count):
+            worker = EventWorker(index=index, queue=asyncio.Queue(self.queue_size))
+            worker.task = asyncio.create_task(worker.run(self.handler))
+            self._workers.append(worker)
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.task.cancel()
+
+        await asyncio.gather(
+            *(worker.task for worker in self._workers),
+            return_exceptions=True,
+        )
+        self._workers.clear()
+
+    async def dispatch(self, key: str, event: BaseEvent):
+        """Put the event into the queue of its worker, waiting while the
+        queue is full."""
+        worker = self._workers[crc32(key.encode()) % len(self._workers)]
+        await worker.queue.put((time.monotonic(), event))
+
+    def stats(self) -> list[EventWorkerStats]:
+        return [worker.stats() for worker in self._workers]
+
+
+@dataclass(frozen=True)
+class BackgroundEventDispatcherStats:
+    queue_depth: int
+    dispatched: int
+    processed: int
+    dropped: int
+    retried: int
+    failed: int
+
+
+@dataclass(eq=False)
+class BackgroundEventDispatcher:
+    """Runs event handlers as scheduler jobs after the caller moved on.
+
+    At most ``max_pending`` handlers are queued or running at a time,
+    anything above that is dropped and counted. A failing handler is
+    retried ``retries`` times with an exponential backoff starting at
+    ``retry_delay`` seconds.
+    """
+
+    scheduler: Scheduler
+    max_pending: int = 1000
+    retries: int = 3
+    retry_delay: float = 0.1
+    dispatched: int = field(default=0, kw_only=True)
+    processed: int = field(default=0, kw_only=True)
+    dropped: int = field(default=0, kw_only=True)
+    retried: int = field(default=0, kw_only=True)
+    failed: int = field(default=0, kw_only=True)
+    _pending: int = field(default=0, kw_only=True)
+    _idle: asyncio.Event = field(default_factory=asyncio.Event, kw_only=True)
+
+    def __post_init__(self):
+        self._idle.set()
+
+    async def dispatch(self, handler: EventHandler, event: BaseEvent) -> bool:
+        """Schedule the handler and return ``False`` if the event was
+        dropped."""
+        return await self.dispatch_batch(handler=handler, events=[event])
+
+    async def dispatch_batch(
+        self,
+        handler: EventHandler,
+        events: list[BaseEvent],
+    ) -> bool:
+        """Schedule a single ``handle_batch`` call for all events."""
+        if self._pending >= self.max_pending or self.scheduler.closed:
+            self.dropped += 1
+            logger.warning(
+                "Dropped %s %s for %s, %s handlers pending",
+                len(events),
+                events[0].__class__.__name__,
+                handler.__class__.__name__,
+                self._pending,
+            )
+            return False
+
+        self._pending += 1
+        self._idle.clear()
+        await self.scheduler.spawn(self._handle(handler=handler, events=events))
+        self.dispatched += 1
+
+        return True
+
+    async def drain(self, timeout: float | None = None):
+        """Wait for the scheduled handlers, e.g. before the broker they
+        publish to is closed."""
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning("%s event handlers still pending on drain", self._pending)
+
+    def stats(self) -> BackgroundEventDispatcherStats:
+        return BackgroundEventDispatcherStats(
+            queue_depth=self._pending,
+            dispatched=self.dispatched,
+            processed=self.processed,
+            dropped=self.dropped,
+            retried=self.retried,
+            failed=self.failed,
+        )
+
+    async def _handle(self, handler: EventHandler, events: list[BaseEvent]):
+        try:
+            for attempt in range(self.retries + 1):
+                try:
+                    if len(events) == 1:
+                        await handler.handle(event=events[0])
+                    else:
+                        await handler.handle_batch(events=events)
+                except Exception:
+                    if attempt == self.retries:
+                        self.failed += 1
+                        logger.exception(
+                            "%s failed to handle %s",
+                            handler.__class__.__name__,
+                            events[0].__class__.__name__,
+                        )
+                        return
+
+                    self.retried += 1
+                    await asyncio.sleep(self.retry_delay * 2**attempt)
+                else:
+                    self.processed += 1
+                    return
+        finally:
+            self._pending -= 1
+
+            if not self._pending:
+                self._idle.set()
@@ -1,4 +1,7 @@
-from dataclasses import dataclass
+from dataclasses import (
+    dataclass,
+    field,
+)
 from typing import ClassVar
 
 from app.domain.events.messages import (
@@ -7,7 +10,11 @@ from app.domain.events.messages import (
     ChatDeletedEvent,
     ListenerAddedEvent,
 )
-from app.infra.message_brokers.converters import convert_event_to_broker_message
+from app.infra.message_brokers.converters import (
+    convert_event_to_broker_message,
+    convert_payloads_to_frame,
+)
+from app.infra.repositories.messages.cached import CachedChatsRepository
 from app.logic.events.base import (
     EventHandler,
     IntegrationEvent,
@@ -26,6 +33,13 @@ class NewChatCreatedEventHandler(EventHandler[NewChatCreatedEvent, None]):
 
 @dataclass
 class NewMessageReceivedEventHandler(EventHandler[NewMessageReceivedEvent, None]):
+    # Sent before the command returns, in the order the messages were
+    # stored. In the background a retried send would be overtaken by later
+    # messages of the chat or delivered twice, and a full dispatcher would
+    # drop a stored message. With kafka_producer_wait_for_delivery
+    # disabled the send only appends to the producer batch.
+    synchronous: ClassVar[bool] = True
+
     async def handle(self, event: NewMessageReceivedEvent) -> None:
         await self.message_broker.send_message(
             topic=self.broker_topic,
@@ -33,24 +47,45 @@ class NewMessageReceivedEventHandler(EventHandler[NewMessageReceivedEvent, None]
             key=event.chat_oid.encode(),
         )
 
+    async def handle_batch(self, events: list[NewMessageReceivedEvent]) -> list[None]:
+        await self.message_broker.send_messages(
+            topic=self.broker_topic,
+            messages=[
+                (event.chat_oid.encode(), convert_event_to_broker_message(event=event))
+                for event in events
+            ],
+        )
 
-@dataclass
+        return [None] * len(events)
+
+
+@dataclass(slots=True)
 class NewMessageReceivedFromBrokerEvent(IntegrationEvent):
     event_title: ClassVar[str] = "New Message From Broker Received"
+    aggregate_oid_field: ClassVar[str] = "chat_oid"
 
     message_text: str
     message_oid: str
     chat_oid: str
 
 
+@dataclass(slots=True)
+class NewMessagePayloadsReceivedFromBrokerEvent(IntegrationEvent):
+    event_title: ClassVar[str] = "New Message Payload From Broker Received"
+    aggregate_oid_field: ClassVar[str] = "chat_oid"
+
+    chat_oid: str
+    payloads: list[bytes]
+
+
 @dataclass
-class NewMessageReceivedFromBrokerEventHandler(
-    EventHandler[NewMessageReceivedFromBrokerEvent, None],
+class NewMessagePayloadsReceivedFromBrokerEventHandler(
+    EventHandler[NewMessagePayloadsReceivedFromBrokerEvent, None],
 ):
-    async def handle(self, event: NewMessageReceivedFromBrokerEvent) -> None:
+    async def handle(self, event: NewMessagePayloadsReceivedFromBrokerEvent) -> None:
         await self.connection_manager.send_all(
             key=event.chat_oid,
-            bytes_=convert_event_to_broker_message(event=event),
+            bytes_=convert_payloads_to_frame(event.payloads),
         )
 
 
@@ -73,5 +108,49 @@ class ListenerAddedEventHandler(
         await self.message_broker.send_message(
             topic=self.broker_topic,
             value=convert_event_to_broker_message(event=event),
-            key=str(event.event_id).encode(),
+            key=event.chat_oid.encode(),
         )
+
+
+@dataclass(slots=True)
+class ChatDeletedFromBrokerEvent(IntegrationEvent):
+    event_title: ClassVar[str] = "Chat Deleted Event From Broker Received"
+    aggregate_oid_field: ClassVar[str] = "chat_oid"
+
+    chat_oid: str
+
+
+@dataclass(slots=True)
+class ListenerAddedFromBrokerEvent(IntegrationEvent):
+    event_title: ClassVar[str] = "Listener Added Event From Broker Received"
+    aggregate_oid_field: ClassVar[str] = "chat_oid"
+
+    chat_oid: str
+
+
+@dataclass
+class DisconnectChatEventHandler(EventHandler[ChatDeletedFromBrokerEvent, None]):
+    """Closes the websockets this node holds for a chat deleted on any
+    node, the node the chat was deleted on has closed its own already."""
+
+    # Runs after the cache eviction even when handlers run concurrently.
+    order_sensitive: ClassVar[bool] = True
+
+    async def handle(self, event: ChatDeletedFromBrokerEvent) -> None:
+        await self.connection_manager.disconnect_all(event.chat_oid)
+
+
+@dataclass
+class InvalidateChatCacheEventHandler(
+    EventHandler[ChatDeletedFromBrokerEvent | ListenerAddedFromBrokerEvent, None],
+):
+    synchronous: ClassVar[bool] = True
+    order_sensitive: ClassVar[bool] = True
+
+    chats_cache: CachedChatsRepository = field(kw_only=True)
+
+    async def handle(
+        self,
+        event: ChatDeletedFromBrokerEvent | ListenerAddedFromBrokerEvent,
+    ) -> None:
+        self.chats_cache.invalidate(event.chat_oid)
@@ -19,3 +19,12 @@ class ChatNotFoundException(LogicException):
     @property
     def message(self):
         return "No chat found with this OID."
+
+
+@dataclass(eq=False)
+class InvalidCursorException(LogicException):
+    cursor: str
+
+    @property
+    def message(self):
+        return f'Invalid pagination cursor "{self.cursor}".'
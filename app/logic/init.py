@@ -1,5 +1,7 @@
-from functools import lru_cache
-from uuid import uuid4
+from functools import (
+    lru_cache,
+    partial,
+)
 
 from aiojobs import Scheduler
 from aiokafka import (
@@ -11,6 +13,7 @@ from punq import (
     Container,
     Scope,
 )
+from pymongo import WriteConcern
 
 from app.domain.events.messages import (
     NewChatCreatedEvent,
@@ -18,37 +21,69 @@ from app.domain.events.messages import (
     ChatDeletedEvent,
     ListenerAddedEvent,
 )
+from app.domain.ids import (
+    ID_GENERATORS,
+    set_id_generator,
+)
 from app.infra.message_brokers.base import BaseMessageBroker
 from app.infra.message_brokers.kafka import KafkaMessageBroker
+from app.infra.message_brokers.memory import MemoryMessageBroker
+from app.infra.message_brokers.offsets import MongoDBOffsetsStore
 from app.infra.repositories.messages.base import (
     BaseChatsRepository,
     BaseMessagesRepository,
 )
+from app.infra.repositories.messages.cached import CachedChatsRepository
+from app.infra.repositories.messages.memory import (
+    MemoryChatsRepository,
+    MemoryMessagesRepository,
+)
 from app.infra.repositories.messages.mongo import (
     MongoDBChatsRepository,
     MongoDBMessagesRepository,
 )
-from app.infra.websockets.managers import BaseConnectionManager, ConnectionManager
+from app.infra.websockets.managers import (
+    BaseConnectionManager,
+    ConnectionManager,
+    OverflowPolicy,
+)
 from app.logic.commands.messages import (
     CreateChatCommand,
     CreateChatCommandHandler,
     CreateMessageCommand,
     CreateMessageCommandHandler,
+    CreateMessagesCommand,
+    CreateMessagesCommandHandler,
     DeleteChatCommandHandler,
     DeleteChatCommand,
     AddTelegramListenerCommandHandler,
     AddTelegramListenerCommand,
 )
+from app.logic.events.dispatchers import (
+    BackgroundEventDispatcher,
+    PartitionedEventDispatcher,
+)
 from app.logic.events.messages import (
     NewChatCreatedEventHandler,
     NewMessageReceivedEventHandler,
-    NewMessageReceivedFromBrokerEventHandler,
-    NewMessageReceivedFromBrokerEvent,
+    NewMessagePayloadsReceivedFromBrokerEvent,
+    NewMessagePayloadsReceivedFromBrokerEventHandler,
     ChatDeleteEventHandler,
+    ChatDeletedFromBrokerEvent,
+    DisconnectChatEventHandler,
+    InvalidateChatCacheEventHandler,
     ListenerAddedEventHandler,
+    ListenerAddedFromBrokerEvent,
 )
 from app.logic.mediator.base import Mediator
 from app.logic.mediator.event import EventMediator
+from app.logic.mediator.middlewares import (
+    BaseMediatorMiddleware,
+    ExceptionCountingMiddleware,
+    InFlightMiddleware,
+    LatencyHistogramMiddleware,
+    SlowHandlerLoggingMiddleware,
+)
 from app.logic.queries.messages import (
     GetChatDetailQuery,
     GetChatDetailQueryHandler,
@@ -73,6 +108,7 @@ def _init_container() -> Container:
     container.register(Config, instance=Config(), scope=Scope.singleton)
 
     config: Config = container.resolve(Config)
+    set_id_generator(ID_GENERATORS[config.ids_generator])
 
     def create_mongodb_client():
         return AsyncIOMotorClient(
@@ -88,29 +124,62 @@ def _init_container() -> Container:
     client = container.resolve(AsyncIOMotorClient)
 
     def init_chats_mongodb_repository() -> BaseChatsRepository:
-        return MongoDBChatsRepository(
+        repository = MongoDBChatsRepository(
             mongo_db_client=client,
             mongo_db_name=config.mongodb_chat_database,
             mongo_db_collection_name=config.mongodb_chat_collection,
         )
 
+        if not config.chats_cache_enabled:
+            return repository
+
+        return CachedChatsRepository(
+            repository=repository,
+            max_size=config.chats_cache_max_size,
+            ttl=config.chats_cache_ttl,
+            negative_ttl=config.chats_cache_negative_ttl,
+        )
+
     def init_messages_mongodb_repository() -> BaseMessagesRepository:
         return MongoDBMessagesRepository(
             mongo_db_client=client,
             mongo_db_name=config.mongodb_chat_database,
             mongo_db_collection_name=config.mongodb_messages_collection,
+            mongo_db_chats_collection_name=config.mongodb_chat_collection,
+            group_commit=config.mongodb_group_commit_enabled,
+            group_commit_max_delay=config.mongodb_group_commit_max_delay_ms / 1000,
+            group_commit_max_batch_size=config.mongodb_group_commit_max_batch_size,
+            write_concern=(
+                None
+                if config.mongodb_group_commit_write_concern is None
+                else WriteConcern(w=config.mongodb_group_commit_write_concern)
+            ),
         )
 
-    container.register(
-        BaseChatsRepository,
-        factory=init_chats_mongodb_repository,
-        scope=Scope.singleton,
-    )
-    container.register(
-        BaseMessagesRepository,
-        factory=init_messages_mongodb_repository,
-        scope=Scope.singleton,
-    )
+    # The in-memory repositories keep everything in this process, for a
+    # single node without MongoDB.
+    if config.repositories_backend == "memory":
+        container.register(
+            BaseChatsRepository,
+            MemoryChatsRepository,
+            scope=Scope.singleton,
+        )
+        container.register(
+            BaseMessagesRepository,
+            MemoryMessagesRepository,
+            scope=Scope.singleton,
+        )
+    else:
+        container.register(
+            BaseChatsRepository,
+            factory=init_chats_mongodb_repository,
+            scope=Scope.singleton,
+        )
+        container.register(
+            BaseMessagesRepository,
+            factory=init_messages_mongodb_repository,
+            scope=Scope.singleton,
+        )
 
     # Command handlers
     container.register(CreateChatCommandHandler)
@@ -123,13 +192,40 @@ def _init_container() -> Container:
     container.register(GetAllChatsListenersQueryHandler)
 
     def create_message_broker() -> BaseMessageBroker:
+        # A node keeping everything in memory shares nothing with others.
+        if config.repositories_backend == "memory":
+            return MemoryMessageBroker()
+
+        broadcast = config.kafka_consumer_mode == "broadcast"
+        offsets_store = None
+
+        if broadcast and config.kafka_consumer_store_offsets:
+            offsets_store = MongoDBOffsetsStore(
+                mongo_db_client=client,
+                mongo_db_name=config.mongodb_chat_database,
+                mongo_db_collection_name=config.mongodb_consumer_offsets_collection,
+            )
+
         return KafkaMessageBroker(
-            producer=AIOKafkaProducer(bootstrap_servers=config.kafka_url),
+            producer=AIOKafkaProducer(
+                bootstrap_servers=config.kafka_url,
+                linger_ms=config.kafka_producer_linger_ms,
+                max_batch_size=config.kafka_producer_max_batch_size,
+                compression_type=config.kafka_producer_compression_type,
+            ),
             consumer=AIOKafkaConsumer(
                 bootstrap_servers=config.kafka_url,
-                group_id=f"chats-{uuid4()}",
+                client_id=config.kafka_consumer_instance_id,
+                group_id=(
+                    None if broadcast else f"chats-{config.kafka_consumer_instance_id}"
+                ),
                 metadata_max_age_ms=30000,
             ),
+            wait_for_delivery=config.kafka_producer_wait_for_delivery,
+            max_in_flight=config.kafka_producer_max_in_flight,
+            broadcast=broadcast,
+            instance_id=config.kafka_consumer_instance_id,
+            offsets_store=offsets_store,
         )
 
     # Message Broker
@@ -141,127 +237,245 @@ def _init_container() -> Container:
 
     container.register(
         BaseConnectionManager,
-        instance=ConnectionManager(),
+        instance=ConnectionManager(
+            send_queue_size=config.websocket_send_queue_size,
+            overflow_policy=OverflowPolicy(config.websocket_overflow_policy),
+            replay_buffer_size=config.websocket_replay_buffer_size,
+            max_replay_buffers=config.websocket_max_replay_buffers,
+            close_timeout=config.websocket_close_timeout,
+        ),
         scope=Scope.singleton,
     )
 
     # Mediator
-    def init_mediator() -> Mediator:
-        mediator = Mediator()
+    # Built once together with all handlers, every request and websocket
+    # connection then resolves the same instance.
+    container.register(
+        Mediator,
+        factory=lambda: _init_mediator(container),
+        scope=Scope.singleton,
+    )
+    container.register(
+        EventMediator,
+        factory=lambda: container.resolve(Mediator),
+        scope=Scope.singleton,
+    )
 
-        # command handlers
-        create_chat_handler = CreateChatCommandHandler(
-            _mediator=mediator,
-            chat_repository=container.resolve(BaseChatsRepository),
-        )
-        create_message_handler = CreateMessageCommandHandler(
-            _mediator=mediator,
-            message_repository=container.resolve(BaseMessagesRepository),
-            chat_repository=container.resolve(BaseChatsRepository),
-        )
-        delete_chat_handler = DeleteChatCommandHandler(
-            _mediator=mediator,
-            chat_repository=container.resolve(BaseChatsRepository),
-        )
-        add_telegram_listener = AddTelegramListenerCommandHandler(
-            _mediator=mediator,
-            chat_repository=container.resolve(BaseChatsRepository),
+    def create_event_dispatcher() -> PartitionedEventDispatcher:
+        mediator: Mediator = container.resolve(Mediator)
+
+        return PartitionedEventDispatcher(
+            handler=partial(
+                mediator.publish,
+                concurrent=config.kafka_consumer_concurrent_publish,
+            ),
+            workers_count=config.kafka_consumer_workers,
+            queue_size=config.kafka_consumer_worker_queue_size,
         )
 
-        # event handlers
-        new_chat_created_event_handler = NewChatCreatedEventHandler(
-            broker_topic=config.new_chats_event_topic,
-            message_broker=container.resolve(BaseMessageBroker),
-            connection_manager=container.resolve(BaseConnectionManager),
+    container.register(
+        PartitionedEventDispatcher,
+        factory=create_event_dispatcher,
+        scope=Scope.singleton,
+    )
+
+    container.register(Scheduler, factory=lambda: Scheduler(), scope=Scope.singleton)
+
+    # Mediator metrics, collected once mediator_metrics_enabled is set.
+    container.register(InFlightMiddleware, scope=Scope.singleton)
+    container.register(ExceptionCountingMiddleware, scope=Scope.singleton)
+    container.register(LatencyHistogramMiddleware, scope=Scope.singleton)
+
+    def create_background_event_dispatcher() -> BackgroundEventDispatcher:
+        return BackgroundEventDispatcher(
+            scheduler=container.resolve(Scheduler),
+            max_pending=config.events_background_max_pending,
+            retries=config.events_background_retries,
+            retry_delay=config.events_background_retry_delay,
         )
-        new_message_received_handler = NewMessageReceivedEventHandler(
+
+    container.register(
+        BackgroundEventDispatcher,
+        factory=create_background_event_dispatcher,
+        scope=Scope.singleton,
+    )
+
+    return container
+
+
+def _init_mediator(container: Container) -> Mediator:
+    config: Config = container.resolve(Config)
+    mediator = Mediator(
+        background_dispatcher=(
+            container.resolve(BackgroundEventDispatcher)
+            if config.events_background_dispatch
+            else None
+        ),
+        middlewares=_init_mediator_middlewares(container),
+    )
+
+    # command handlers
+    create_chat_handler = CreateChatCommandHandler(
+        _mediator=mediator,
+        chat_repository=container.resolve(BaseChatsRepository),
+    )
+    create_message_handler = CreateMessageCommandHandler(
+        _mediator=mediator,
+        message_repository=container.resolve(BaseMessagesRepository),
+        chat_repository=container.resolve(BaseChatsRepository),
+    )
+    create_messages_handler = CreateMessagesCommandHandler(
+        _mediator=mediator,
+        message_repository=container.resolve(BaseMessagesRepository),
+        chat_repository=container.resolve(BaseChatsRepository),
+    )
+    delete_chat_handler = DeleteChatCommandHandler(
+        _mediator=mediator,
+        chat_repository=container.resolve(BaseChatsRepository),
+    )
+    add_telegram_listener = AddTelegramListenerCommandHandler(
+        _mediator=mediator,
+        chat_repository=container.resolve(BaseChatsRepository),
+    )
+
+    # event handlers
+    new_chat_created_event_handler = NewChatCreatedEventHandler(
+        broker_topic=config.new_chats_event_topic,
+        message_broker=container.resolve(BaseMessageBroker),
+        connection_manager=container.resolve(BaseConnectionManager),
+    )
+    new_message_received_handler = NewMessageReceivedEventHandler(
+        message_broker=container.resolve(BaseMessageBroker),
+        broker_topic=config.new_messages_received_event_topic,
+        connection_manager=container.resolve(BaseConnectionManager),
+    )
+    new_message_payloads_received_from_broker_event_handler = (
+        NewMessagePayloadsReceivedFromBrokerEventHandler(
             message_broker=container.resolve(BaseMessageBroker),
             broker_topic=config.new_messages_received_event_topic,
             connection_manager=container.resolve(BaseConnectionManager),
         )
-        new_message_received_from_broker_event_handler = (
-            NewMessageReceivedFromBrokerEventHandler(
-                message_broker=container.resolve(BaseMessageBroker),
-                broker_topic=config.new_messages_received_event_topic,
-                connection_manager=container.resolve(BaseConnectionManager),
-            )
-        )
-        chat_deleted_event_handler = ChatDeleteEventHandler(
-            message_broker=container.resolve(BaseMessageBroker),
-            broker_topic=config.chat_deleted_event_topic,
-            connection_manager=container.resolve(BaseConnectionManager),
-        )
-        new_listener_added_event_handler = ListenerAddedEventHandler(
+    )
+    chat_deleted_event_handler = ChatDeleteEventHandler(
+        message_broker=container.resolve(BaseMessageBroker),
+        broker_topic=config.chat_deleted_event_topic,
+        connection_manager=container.resolve(BaseConnectionManager),
+    )
+    new_listener_added_event_handler = ListenerAddedEventHandler(
+        message_broker=container.resolve(BaseMessageBroker),
+        broker_topic=config.new_listener_added_event_topic,
+        connection_manager=container.resolve(BaseConnectionManager),
+    )
+    disconnect_chat_event_handler = DisconnectChatEventHandler(
+        message_broker=container.resolve(BaseMessageBroker),
+        connection_manager=container.resolve(BaseConnectionManager),
+    )
+
+    # Event
+    mediator.register_event(
+        NewChatCreatedEvent,
+        [new_chat_created_event_handler],
+    )
+    mediator.register_event(
+        NewMessageReceivedEvent,
+        [new_message_received_handler],
+    )
+    mediator.register_event(
+        NewMessagePayloadsReceivedFromBrokerEvent,
+        [new_message_payloads_received_from_broker_event_handler],
+    )
+    mediator.register_event(
+        ChatDeletedEvent,
+        [chat_deleted_event_handler],
+    )
+    mediator.register_event(
+        ListenerAddedEvent,
+        [new_listener_added_event_handler],
+    )
+
+    chat_repository = container.resolve(BaseChatsRepository)
+
+    if isinstance(chat_repository, CachedChatsRepository):
+        # Chats changed on any node, this one included, come back from
+        # the broker and are evicted from the local cache.
+        invalidate_chat_cache_event_handler = InvalidateChatCacheEventHandler(
             message_broker=container.resolve(BaseMessageBroker),
-            broker_topic=config.new_listener_added_event_topic,
             connection_manager=container.resolve(BaseConnectionManager),
-        )
-
-        # Event
-        mediator.register_event(
-            NewChatCreatedEvent,
-            [new_chat_created_event_handler],
-        )
-        mediator.register_event(
-            NewMessageReceivedEvent,
-            [new_message_received_handler],
+            chats_cache=chat_repository,
         )
         mediator.register_event(
-            NewMessageReceivedFromBrokerEvent,
-            [new_message_received_from_broker_event_handler],
+            ChatDeletedFromBrokerEvent,
+            [invalidate_chat_cache_event_handler],
         )
         mediator.register_event(
-            ChatDeletedEvent,
-            [chat_deleted_event_handler],
-        )
-        mediator.register_event(
-            ListenerAddedEvent,
-            [new_listener_added_event_handler],
+            ListenerAddedFromBrokerEvent,
+            [invalidate_chat_cache_event_handler],
         )
 
-        # Commands
-        mediator.register_command(
-            CreateChatCommand,
-            [create_chat_handler],
-        )
-        mediator.register_command(
-            CreateMessageCommand,
-            [create_message_handler],
-        )
-        mediator.register_command(
-            DeleteChatCommand,
-            [delete_chat_handler],
-        )
+    # Registered after the cache eviction and, like it, order-sensitive, so
+    # clients reconnecting to this node right away do not find the chat in
+    # the cache.
+    mediator.register_event(
+        ChatDeletedFromBrokerEvent,
+        [disconnect_chat_event_handler],
+    )
 
-        mediator.register_command(
-            AddTelegramListenerCommand,
-            [add_telegram_listener],
-        )
+    # Commands
+    mediator.register_command(
+        CreateChatCommand,
+        [create_chat_handler],
+    )
+    mediator.register_command(
+        CreateMessageCommand,
+        [create_message_handler],
+    )
+    mediator.register_command(
+        CreateMessagesCommand,
+        [create_messages_handler],
+    )
+    mediator.register_command(
+        DeleteChatCommand,
+        [delete_chat_handler],
+    )
 
-        # Queries
-        mediator.register_query(
-            GetChatDetailQuery,
-            container.resolve(GetChatDetailQueryHandler),
-        )
-        mediator.register_query(
-            GetMessagesQuery,
-            container.resolve(GetMessagesQueryHandler),
-        )
+    mediator.register_command(
+        AddTelegramListenerCommand,
+        [add_telegram_listener],
+    )
 
-        mediator.register_query(
-            GetAllChatsQuery,
-            container.resolve(GetAllChatsQueryHandler),
-        )
-        mediator.register_query(
-            GetAllChatsListenersQuery,
-            container.resolve(GetAllChatsListenersQueryHandler),
-        )
+    # Queries
+    mediator.register_query(
+        GetChatDetailQuery,
+        container.resolve(GetChatDetailQueryHandler),
+    )
+    mediator.register_query(
+        GetMessagesQuery,
+        container.resolve(GetMessagesQueryHandler),
+    )
 
-        return mediator
+    mediator.register_query(
+        GetAllChatsQuery,
+        container.resolve(GetAllChatsQueryHandler),
+    )
+    mediator.register_query(
+        GetAllChatsListenersQuery,
+        container.resolve(GetAllChatsListenersQueryHandler),
+    )
 
-    container.register(Mediator, factory=init_mediator)
-    container.register(EventMediator, factory=init_mediator)
+    return mediator
 
-    container.register(Scheduler, factory=lambda: Scheduler(), scope=Scope.singleton)
 
-    return container
+def _init_mediator_middlewares(container: Container) -> list[BaseMediatorMiddleware]:
+    config: Config = container.resolve(Config)
+
+    if not config.mediator_metrics_enabled:
+        return []
+
+    return [
+        container.resolve(InFlightMiddleware),
+        container.resolve(ExceptionCountingMiddleware),
+        container.resolve(LatencyHistogramMiddleware),
+        SlowHandlerLoggingMiddleware(
+            threshold=config.mediator_slow_handler_threshold,
+        ),
+    ]
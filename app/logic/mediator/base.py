@@ -1,5 +1,9 @@
-from collections import defaultdict
-from collections.abc import Iterable
+import asyncio
+from collections.abc import (
+    Awaitable,
+    Callable,
+    Iterable,
+)
 from dataclasses import (
     dataclass,
     field,
@@ -17,9 +21,11 @@ from app.logic.events.base import (
     ET,
     EventHandler,
 )
+from app.logic.events.dispatchers import BackgroundEventDispatcher
 from app.logic.exceptions.mediator import CommandHandlersNotRegisteredException
 from app.logic.mediator.command import CommandMediator
 from app.logic.mediator.event import EventMediator
+from app.logic.mediator.middlewares import BaseMediatorMiddleware
 from app.logic.mediator.query import QueryMediator
 from app.logic.queries.base import (
     BaseQuery,
@@ -29,40 +35,112 @@ from app.logic.queries.base import (
 )
 
 
+@dataclass(frozen=True)
+class CoalescingStats:
+    executed: int
+    coalesced: int
+    in_flight: int
+
+
 @dataclass(eq=False)
 class Mediator(EventMediator, QueryMediator, CommandMediator):
-    events_map: dict[ET, EventHandler] = field(
-        default_factory=lambda: defaultdict(list),
+    events_map: dict[ET, tuple[EventHandler, ...]] = field(
+        default_factory=dict,
         kw_only=True,
     )
-    commands_map: dict[CT, CommandHandler] = field(
-        default_factory=lambda: defaultdict(list),
+    commands_map: dict[CT, tuple[CommandHandler, ...]] = field(
+        default_factory=dict,
         kw_only=True,
     )
     queries_map: dict[QT, BaseQueryHandler] = field(
         default_factory=dict,
         kw_only=True,
     )
+    background_dispatcher: BackgroundEventDispatcher | None = field(
+        default=None,
+        kw_only=True,
+    )
+    middlewares: list[BaseMediatorMiddleware] = field(
+        default_factory=list,
+        kw_only=True,
+    )
+    _queries_in_flight: dict[BaseQuery, asyncio.Task] = field(
+        default_factory=dict,
+        kw_only=True,
+    )
+    _queries_executed: int = field(default=0, kw_only=True)
+    _queries_coalesced: int = field(default=0, kw_only=True)
 
     def register_event(self, event: ET, event_handlers: Iterable[EventHandler[ET, ER]]):
-        self.events_map[event].extend(event_handlers)
+        self.events_map[event] = (*self.events_map.get(event, ()), *event_handlers)
 
     def register_command(
         self,
         command: CT,
         command_handlers: Iterable[CommandHandler[CT, CR]],
     ):
-        self.commands_map[command].extend(command_handlers)
+        self.commands_map[command] = (
+            *self.commands_map.get(command, ()),
+            *command_handlers,
+        )
 
     def register_query(self, query: QT, query_handler: BaseQueryHandler[QT, QR]) -> QR:
         self.queries_map[query] = query_handler
 
-    async def publish(self, events: Iterable[BaseEvent]) -> Iterable[ER]:
+    async def publish(
+        self,
+        events: Iterable[BaseEvent],
+        background: bool = False,
+        concurrent: bool = False,
+    ) -> Iterable[ER]:
+        """Run the handlers of every event.
+
+        With ``background`` set and a dispatcher configured, handlers that
+        are not marked synchronous are scheduled instead of awaited and
+        leave no result.
+
+        With ``concurrent`` set, events of different aggregates and the
+        handlers of one event run concurrently, while events of the same
+        aggregate are still handled one after another. All failures are
+        collected, more than one is raised as an ``ExceptionGroup``.
+        """
+        dispatcher = self.background_dispatcher if background else None
+
+        if concurrent:
+            return await self._publish_concurrently(events, dispatcher)
+
         result = []
         for event in events:
-            handlers: Iterable[EventHandler] = self.events_map[event.__class__]
-            for handler in handlers:
-                result.append(await handler.handle(event=event))
+            result.extend(await self._dispatch_event(event, dispatcher))
+
+        return result
+
+    async def publish_batch(
+        self,
+        events: Iterable[BaseEvent],
+        background: bool = False,
+    ) -> Iterable[ER]:
+        """Run every handler once per event type through ``handle_batch``.
+
+        Events are grouped by type, so events of different types are not
+        handled in the order they were passed.
+        """
+        dispatcher = self.background_dispatcher if background else None
+        groups: dict[type[BaseEvent], list[BaseEvent]] = {}
+        for event in events:
+            groups.setdefault(event.__class__, []).append(event)
+
+        result = []
+        for group in groups.values():
+            if self.middlewares:
+                result.extend(
+                    await self._call_middlewares(
+                        group[0],
+                        lambda group=group: self._publish_group(group, dispatcher),
+                    ),
+                )
+            else:
+                result.extend(await self._publish_group(group, dispatcher))
 
         return result
 
@@ -73,7 +151,217 @@ class Mediator(EventMediator, QueryMediator, CommandMediator):
         if not handlers:
             raise CommandHandlersNotRegisteredException(command_type)
 
-        return [await handler.handle(command) for handler in handlers]
+        if self.middlewares:
+            return await self._call_middlewares(
+                command,
+                lambda: self._handle_command(command, handlers),
+            )
+
+        return await self._handle_command(command, handlers)
 
     async def handle_query(self, query: BaseQuery) -> QR:
-        return await self.queries_map[query.__class__].handle(query=query)
+        if self.middlewares:
+            return await self._call_middlewares(
+                query,
+                lambda: self._handle_query(query),
+            )
+
+        return await self._handle_query(query)
+
+    def coalescing_stats(self) -> CoalescingStats:
+        return CoalescingStats(
+            executed=self._queries_executed,
+            coalesced=self._queries_coalesced,
+            in_flight=len(self._queries_in_flight),
+        )
+
+    def _call_middlewares(
+        self,
+        message: object,
+        call: Callable[[], Awaitable],
+        index: int = 0,
+    ) -> Awaitable:
+        if index == len(self.middlewares):
+            return call()
+
+        return self.middlewares[index](
+            message,
+            lambda: self._call_middlewares(message, call, index + 1),
+        )
+
+    def _dispatch_event(
+        self,
+        event: BaseEvent,
+        dispatcher: BackgroundEventDispatcher | None,
+        concurrent: bool = False,
+    ) -> Awaitable[list[ER]]:
+        publish_event = (
+            self._publish_event_concurrently if concurrent else self._publish_event
+        )
+
+        if self.middlewares:
+            return self._call_middlewares(
+                event,
+                lambda: publish_event(event, dispatcher),
+            )
+
+        return publish_event(event, dispatcher)
+
+    async def _publish_concurrently(
+        self,
+        events: Iterable[BaseEvent],
+        dispatcher: BackgroundEventDispatcher | None,
+    ) -> list[ER]:
+        # Events without an aggregate share one chain and keep their order.
+        chains: dict[str | None, list[tuple[int, BaseEvent]]] = {}
+        for index, event in enumerate(events):
+            chains.setdefault(event.aggregate_oid, []).append((index, event))
+
+        outcomes = await asyncio.gather(
+            *(self._publish_chain(chain, dispatcher) for chain in chains.values()),
+            return_exceptions=True,
+        )
+        _raise_errors(
+            [outcome for outcome in outcomes if isinstance(outcome, BaseException)],
+        )
+
+        results = sorted(
+            (item for outcome in outcomes for item in outcome),
+            key=lambda item: item[0],
+        )
+
+        return [result for _, event_results in results for result in event_results]
+
+    async def _publish_chain(
+        self,
+        chain: list[tuple[int, BaseEvent]],
+        dispatcher: BackgroundEventDispatcher | None,
+    ) -> list[tuple[int, list[ER]]]:
+        # A failed event stops its chain, the later events of the same
+        # aggregate must not overtake it.
+        return [
+            (index, await self._dispatch_event(event, dispatcher, concurrent=True))
+            for index, event in chain
+        ]
+
+    async def _publish_event_concurrently(
+        self,
+        event: BaseEvent,
+        dispatcher: BackgroundEventDispatcher | None,
+    ) -> list[ER]:
+        independent = []
+        ordered = []
+        handlers: Iterable[EventHandler] = self.events_map.get(event.__class__, ())
+        for index, handler in enumerate(handlers):
+            if dispatcher is not None and not handler.synchronous:
+                await dispatcher.dispatch(handler=handler, event=event)
+            elif handler.order_sensitive:
+                ordered.append((index, handler))
+            else:
+                independent.append(_handle_event(index, handler, event))
+
+        if ordered:
+            independent.append(_handle_event_in_order(ordered, event))
+
+        outcomes = await asyncio.gather(*independent, return_exceptions=True)
+        _raise_errors(
+            [outcome for outcome in outcomes if isinstance(outcome, BaseException)],
+        )
+
+        return [
+            result
+            for _, result in sorted(
+                (item for outcome in outcomes for item in outcome),
+                key=lambda item: item[0],
+            )
+        ]
+
+    async def _publish_group(
+        self,
+        events: list[BaseEvent],
+        dispatcher: BackgroundEventDispatcher | None,
+    ) -> list[ER]:
+        result = []
+        handlers: Iterable[EventHandler] = self.events_map.get(events[0].__class__, ())
+        for handler in handlers:
+            if dispatcher is not None and not handler.synchronous:
+                await dispatcher.dispatch_batch(handler=handler, events=events)
+                continue
+
+            result.extend(await handler.handle_batch(events=events))
+
+        return result
+
+    async def _publish_event(
+        self,
+        event: BaseEvent,
+        dispatcher: BackgroundEventDispatcher | None,
+    ) -> list[ER]:
+        result = []
+        handlers: Iterable[EventHandler] = self.events_map.get(event.__class__, ())
+        for handler in handlers:
+            if dispatcher is not None and not handler.synchronous:
+                await dispatcher.dispatch(handler=handler, event=event)
+                continue
+
+            result.append(await handler.handle(event=event))
+
+        return result
+
+    async def _handle_command(
+        self,
+        command: BaseCommand,
+        handlers: Iterable[CommandHandler],
+    ) -> list[CR]:
+        return [await handler.handle(command) for handler in handlers]
+
+    async def _handle_query(self, query: BaseQuery) -> QR:
+        handler = self.queries_map[query.__class__]
+
+        if not query.coalesce:
+            return await handler.handle(query=query)
+
+        task = self._queries_in_flight.get(query)
+
+        if task is None:
+            task = asyncio.create_task(handler.handle(query=query))
+            task.add_done_callback(
+                lambda task: self._on_query_done(task, query=query),
+            )
+            self._queries_in_flight[query] = task
+            self._queries_executed += 1
+        else:
+            self._queries_coalesced += 1
+
+        # A cancelled caller must not cancel the call the others wait for.
+        return await asyncio.shield(task)
+
+    def _on_query_done(self, task: asyncio.Task, query: BaseQuery):
+        self._queries_in_flight.pop(query, None)
+
+        if not task.cancelled():
+            # Retrieved here as well, every caller may have been cancelled.
+            task.exception()
+
+
+async def _handle_event(
+    index: int,
+    handler: EventHandler,
+    event: BaseEvent,
+) -> list[tuple[int, ER]]:
+    return [(index, await handler.handle(event=event))]
+
+
+async def _handle_event_in_order(
+    handlers: list[tuple[int, EventHandler]],
+    event: BaseEvent,
+) -> list[tuple[int, ER]]:
+    return [(index, await handler.handle(event=event)) for index, handler in handlers]
+
+
+def _raise_errors(errors: list[BaseException]):
+    if len(errors) == 1:
+        raise errors[0]
+
+    if errors:
+        raise BaseExceptionGroup("Event handlers failed", errors)
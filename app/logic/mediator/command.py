@@ -2,7 +2,6 @@ from abc import (
     ABC,
     abstractmethod,
 )
-from collections import defaultdict
 from collections.abc import Iterable
 from dataclasses import (
     dataclass,
@@ -19,8 +18,8 @@ from app.logic.commands.base import (
 
 @dataclass(eq=False)
 class CommandMediator(ABC):
-    commands_map: dict[CT, CommandHandler] = field(
-        default_factory=lambda: defaultdict(list),
+    commands_map: dict[CT, tuple[CommandHandler, ...]] = field(
+        default_factory=dict,
         kw_only=True,
     )
 
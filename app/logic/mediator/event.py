@@ -2,7 +2,6 @@ from abc import (
     ABC,
     abstractmethod,
 )
-from collections import defaultdict
 from collections.abc import Iterable
 from dataclasses import (
     dataclass,
@@ -19,8 +18,8 @@ from app.logic.events.base import (
 
 @dataclass(eq=False)
 class EventMediator(ABC):
-    events_map: dict[ET, EventHandler] = field(
-        default_factory=lambda: defaultdict(list),
+    events_map: dict[ET, tuple[EventHandler, ...]] = field(
+        default_factory=dict,
         kw_only=True,
     )
 
@@ -32,4 +31,16 @@ class EventMediator(ABC):
     ): ...
 
     @abstractmethod
-    async def publish(self, events: Iterable[BaseEvent]) -> Iterable[ER]: ...
+    async def publish(
+        self,
+        events: Iterable[BaseEvent],
+        background: bool = False,
+        concurrent: bool = False,
+    ) -> Iterable[ER]: ...
+
+    @abstractmethod
+    async def publish_batch(
+        self,
+        events: Iterable[BaseEvent],
+        background: bool = False,
+    ) -> Iterable[ER]: ...
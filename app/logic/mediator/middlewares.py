@@ -0,0 +1,137 @@
+import logging
+import time
+from abc import (
+    ABC,
+    abstractmethod,
+)
+from bisect import bisect_left
+from collections import (
+    Counter,
+    defaultdict,
+)
+from collections.abc import (
+    Awaitable,
+    Callable,
+)
+from dataclasses import (
+    dataclass,
+    field,
+)
+from typing import Any
+
+
+logger = logging.getLogger(__name__)
+
+CallNext = Callable[[], Awaitable[Any]]
+
+DEFAULT_LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+)
+
+
+class BaseMediatorMiddleware(ABC):
+    """Wraps the dispatch of a single command, query or event.
+
+    ``call_next`` runs the rest of the chain and finally the handlers,
+    its result has to be returned.
+    """
+
+    @abstractmethod
+    async def __call__(self, message: object, call_next: CallNext) -> Any: ...
+
+
+@dataclass
+class LatencyHistogram:
+    buckets: tuple[float, ...]
+    counts: list[int]
+    count: int = 0
+    total: float = 0
+
+    @classmethod
+    def create(cls, buckets: tuple[float, ...]) -> "LatencyHistogram":
+        # The last counter takes everything above the largest bucket.
+        return cls(buckets=buckets, counts=[0] * (len(buckets) + 1))
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+
+@dataclass(eq=False)
+class LatencyHistogramMiddleware(BaseMediatorMiddleware):
+    buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS
+    histograms: dict[str, LatencyHistogram] = field(default_factory=dict)
+
+    async def __call__(self, message: object, call_next: CallNext) -> Any:
+        started_at = time.perf_counter()
+
+        try:
+            return await call_next()
+        finally:
+            name = message.__class__.__name__
+            histogram = self.histograms.get(name)
+
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram.create(
+                    self.buckets,
+                )
+
+            histogram.observe(time.perf_counter() - started_at)
+
+
+@dataclass(eq=False)
+class InFlightMiddleware(BaseMediatorMiddleware):
+    in_flight: defaultdict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+    async def __call__(self, message: object, call_next: CallNext) -> Any:
+        name = message.__class__.__name__
+        self.in_flight[name] += 1
+
+        try:
+            return await call_next()
+        finally:
+            self.in_flight[name] -= 1
+
+
+@dataclass(eq=False)
+class SlowHandlerLoggingMiddleware(BaseMediatorMiddleware):
+    threshold: float = 0.5
+
+    async def __call__(self, message: object, call_next: CallNext) -> Any:
+        started_at = time.perf_counter()
+
+        try:
+            return await call_next()
+        finally:
+            elapsed = time.perf_counter() - started_at
+
+            if elapsed > self.threshold:
+                logger.warning(
+                    "%s took %.3fs to handle",
+                    message.__class__.__name__,
+                    elapsed,
+                )
+
+
+@dataclass(eq=False)
+class ExceptionCountingMiddleware(BaseMediatorMiddleware):
+    exceptions: Counter[tuple[str, str]] = field(default_factory=Counter)
+
+    async def __call__(self, message: object, call_next: CallNext) -> Any:
+        try:
+            return await call_next()
+        except Exception as exception:
+            self.exceptions[
+                (message.__class__.__name__, exception.__class__.__name__)
+            ] += 1
+            raise
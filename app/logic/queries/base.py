@@ -5,13 +5,17 @@ from abc import (
 from dataclasses import dataclass
 from typing import (
     Any,
+    ClassVar,
     Generic,
     TypeVar,
 )
 
 
 @dataclass(frozen=True)
-class BaseQuery(ABC): ...
+class BaseQuery(ABC):
+    # Concurrent equal queries of a coalescing type share one handler call
+    # and therefore the same result object, which must not be mutated.
+    coalesce: ClassVar[bool] = False
 
 
 QT = TypeVar("QT", bound=BaseQuery)
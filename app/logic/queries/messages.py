@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from typing import (
+    ClassVar,
     Generic,
     Iterable,
 )
@@ -28,6 +29,8 @@ from app.logic.queries.base import (
 
 @dataclass(frozen=True)
 class GetChatDetailQuery(BaseQuery):
+    coalesce: ClassVar[bool] = True
+
     chat_oid: str
 
 
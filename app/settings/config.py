@@ -1,3 +1,6 @@
+from socket import gethostname
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
@@ -13,6 +16,12 @@ class Config(BaseSettings):
         default="messages",
         alias="MONGO_DB_MESSAGE_COLLECTION",
     )
+    ids_generator: Literal["uuid4", "uuid7"] = Field(default="uuid7")
+    repositories_backend: Literal["mongodb", "memory"] = Field(default="mongodb")
+    mongodb_group_commit_enabled: bool = Field(default=False)
+    mongodb_group_commit_max_delay_ms: int = Field(default=5)
+    mongodb_group_commit_max_batch_size: int = Field(default=500)
+    mongodb_group_commit_write_concern: int | str | None = Field(default=None)
     kafka_url: str = Field(default="kafka:29092", alias="KAFKA_URL")
 
     new_chats_event_topic: str = Field(default="new-chats-topic")
@@ -21,3 +30,45 @@ class Config(BaseSettings):
     )
     chat_deleted_event_topic: str = Field(default="chat-deleted-topic")
     new_listener_added_event_topic: str = Field(default="new-listener-added-topic")
+    kafka_consumer_mode: Literal["group", "broadcast"] = Field(default="broadcast")
+    kafka_consumer_instance_id: str = Field(default_factory=gethostname)
+    kafka_consumer_store_offsets: bool = Field(default=False)
+    mongodb_consumer_offsets_collection: str = Field(default="consumer_offsets")
+    kafka_consumer_passthrough: bool = Field(default=True)
+    kafka_consumer_max_records: int = Field(default=500)
+    kafka_consumer_timeout_ms: int = Field(default=100)
+    kafka_consumer_workers: int = Field(default=8)
+    kafka_consumer_concurrent_publish: bool = Field(default=True)
+    kafka_consumer_worker_queue_size: int = Field(default=100)
+
+    mediator_metrics_enabled: bool = Field(default=False)
+    mediator_slow_handler_threshold: float = Field(default=0.5)
+
+    events_background_dispatch: bool = Field(default=True)
+    events_background_max_pending: int = Field(default=1000)
+    events_background_retries: int = Field(default=3)
+    events_background_retry_delay: float = Field(default=0.1)
+    events_background_drain_timeout: float = Field(default=10)
+
+    kafka_producer_wait_for_delivery: bool = Field(default=True)
+    kafka_producer_linger_ms: int = Field(default=0)
+    kafka_producer_max_batch_size: int = Field(default=16384)
+    kafka_producer_compression_type: Literal["gzip", "snappy", "lz4", "zstd"] | None = (
+        Field(default=None)
+    )
+    kafka_producer_max_in_flight: int = Field(default=1000)
+
+    chats_cache_enabled: bool = Field(default=True)
+    chats_cache_max_size: int = Field(default=10_000)
+    chats_cache_ttl: float = Field(default=60)
+    chats_cache_negative_ttl: float = Field(default=5)
+
+    websocket_send_queue_size: int = Field(default=100)
+    websocket_replay_buffer_size: int = Field(default=100)
+    websocket_max_replay_buffers: int = Field(default=10_000)
+    websocket_overflow_policy: Literal["drop_oldest", "disconnect"] = Field(
+        default="drop_oldest",
+    )
+    websocket_close_timeout: float = Field(default=1)
+    websocket_inbound_batch_size: int = Field(default=100)
+    websocket_inbound_batch_delay: float = Field(default=0.005)
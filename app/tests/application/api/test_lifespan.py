@@ -0,0 +1,79 @@
+import orjson
+
+from app.application.api.lifespan import (
+    convert_records_to_events,
+    get_topic_events_map,
+    group_records_by_chat,
+)
+from app.infra.message_brokers.dtos import BrokerRecord
+from app.logic.events.messages import (
+    ChatDeletedFromBrokerEvent,
+    ListenerAddedFromBrokerEvent,
+    NewMessagePayloadsReceivedFromBrokerEvent,
+)
+from app.settings.config import Config
+
+
+def test_records_are_grouped_by_chat_in_order():
+    records = [
+        BrokerRecord(topic="topic", key=chat_oid.encode(), value=value)
+        for chat_oid, value in (
+            ("first", b"1"),
+            ("second", b"2"),
+            ("first", b"3"),
+        )
+    ]
+
+    events = group_records_by_chat(records=records, passthrough=True)
+
+    assert [(event.chat_oid, event.payloads) for event in events] == [
+        ("first", [b"1", b"3"]),
+        ("second", [b"2"]),
+    ]
+
+
+def test_records_are_reencoded_without_passthrough():
+    value = orjson.dumps(
+        {"message_text": "text", "message_oid": "message", "chat_oid": "chat"},
+    )
+    records = [BrokerRecord(topic="topic", key=None, value=value)]
+
+    event, *_ = group_records_by_chat(records=records, passthrough=False)
+    payload = orjson.loads(event.payloads[0])
+
+    assert event.chat_oid == "chat"
+    assert payload["message_text"] == "text"
+    assert payload["message_oid"] == "message"
+
+
+def test_records_are_converted_to_events_in_order():
+    config = Config()
+    records = [
+        BrokerRecord(topic=topic, key=chat_oid.encode(), value=value)
+        for topic, chat_oid, value in (
+            (config.new_messages_received_event_topic, "chat", b"1"),
+            (config.new_messages_received_event_topic, "other", b"2"),
+            (config.new_messages_received_event_topic, "chat", b"3"),
+            (config.chat_deleted_event_topic, "chat", b"{}"),
+            ("unknown-topic", "chat", b"{}"),
+            (config.new_messages_received_event_topic, "other", b"4"),
+            (config.new_listener_added_event_topic, "other", b"{}"),
+        )
+    ]
+
+    events = convert_records_to_events(
+        records=records,
+        config=config,
+        topic_events_map=get_topic_events_map(config),
+    )
+
+    assert [
+        (type(event), event.chat_oid, getattr(event, "payloads", None))
+        for event in events
+    ] == [
+        (NewMessagePayloadsReceivedFromBrokerEvent, "chat", [b"1", b"3"]),
+        (NewMessagePayloadsReceivedFromBrokerEvent, "other", [b"2"]),
+        (ChatDeletedFromBrokerEvent, "chat", None),
+        (NewMessagePayloadsReceivedFromBrokerEvent, "other", [b"4"]),
+        (ListenerAddedFromBrokerEvent, "other", None),
+    ]
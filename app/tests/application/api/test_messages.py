@@ -49,3 +49,31 @@ async def test_create_chat_fail_text_empty(app: FastAPI, client: TestClient):
     json_data = response.json()
 
     assert json_data["detail"]["error"] == "Text cannot be empty"
+
+
+@pytest.mark.asyncio
+async def test_get_chats_fail_invalid_cursor(app: FastAPI, client: TestClient):
+    url = app.url_path_for("get_all_chats_handler")
+    response: Response = client.get(url=url, params={"before": "not-a-cursor"})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST, response.json()
+    json_data = response.json()
+
+    assert json_data["detail"]["error"] == 'Invalid pagination cursor "not-a-cursor".'
+
+
+@pytest.mark.asyncio
+async def test_get_metrics(app: FastAPI, client: TestClient, faker: Faker):
+    client.post(
+        url=app.url_path_for("create_chat_handler"),
+        json={"title": faker.text(max_nb_chars=30)},
+    )
+    response: Response = client.get(url=app.url_path_for("get_metrics_handler"))
+
+    assert response.is_success, response.json()
+    json_data = response.json()
+
+    assert json_data["background_events"]["dispatched"] >= 0
+    assert json_data["queries_coalescing"]["executed"] >= 0
+    assert json_data["chats_cache"] is None
+    assert json_data["messages_group_commit"] is None
@@ -0,0 +1,112 @@
+import asyncio
+
+import orjson
+import pytest
+from faker import Faker
+
+from app.application.api.v1.messages.websockets.batching import (
+    InboundMessagesBatcher,
+)
+from app.domain.entities.messages import Chat
+from app.domain.values.messages import Title
+from app.infra.repositories.filters.messages import GetMessagesFilters
+from app.infra.repositories.messages.base import (
+    BaseChatsRepository,
+    BaseMessagesRepository,
+)
+from app.logic.mediator.base import Mediator
+
+
+@pytest.mark.asyncio
+async def test_inbound_messages_batcher_acks_every_frame(
+    chat_repository: BaseChatsRepository,
+    mediator: Mediator,
+    container,
+    faker: Faker,
+):
+    chat = Chat(title=Title(faker.text(max_nb_chars=30)))
+    await chat_repository.add_chat(chat)
+    acks: list[dict] = []
+
+    async def ack(bytes_: bytes):
+        acks.append(orjson.loads(bytes_))
+
+    batcher = InboundMessagesBatcher(
+        mediator=mediator,
+        chat_oid=chat.oid,
+        ack=ack,
+        max_batch_size=2,
+    )
+    batcher.start()
+
+    await batcher.put(orjson.dumps({"text": "first", "id": 1}).decode())
+    await batcher.put("not json")
+    await batcher.put(orjson.dumps({"text": "", "id": 2}).decode())
+    await batcher.put(orjson.dumps({"text": "third", "id": 3}).decode())
+    await batcher.close()
+
+    assert acks[0] == {"ack": None, "error": "Frame is not valid JSON"}
+    assert [ack["ack"] for ack in acks[1:]] == [1, 2, 3]
+    assert "oid" in acks[1] and "error" in acks[2] and "oid" in acks[3]
+
+    messages_repository = container.resolve(BaseMessagesRepository)
+    messages, _ = await messages_repository.get_messages(
+        chat_oid=chat.oid,
+        filters=GetMessagesFilters(),
+    )
+
+    assert [message.oid for message in messages] == [acks[1]["oid"], acks[3]["oid"]]
+
+
+@pytest.mark.asyncio
+async def test_inbound_messages_batcher_chat_not_found(mediator: Mediator):
+    acks: list[dict] = []
+
+    async def ack(bytes_: bytes):
+        acks.append(orjson.loads(bytes_))
+
+    batcher = InboundMessagesBatcher(mediator=mediator, chat_oid="missing", ack=ack)
+    batcher.start()
+
+    await batcher.put(orjson.dumps({"text": "hello", "id": "a"}).decode())
+    await batcher.close()
+
+    assert len(acks) == 1
+    assert acks[0]["ack"] == "a" and "error" in acks[0]
+
+
+class FailingMediator:
+    def __init__(self):
+        self.calls = 0
+
+    async def handle_command(self, command):
+        self.calls += 1
+        raise RuntimeError("Storage is down")
+
+
+@pytest.mark.asyncio
+async def test_inbound_messages_batcher_survives_unexpected_errors():
+    mediator = FailingMediator()
+    acks: list[dict] = []
+
+    async def ack(bytes_: bytes):
+        acks.append(orjson.loads(bytes_))
+
+    batcher = InboundMessagesBatcher(
+        mediator=mediator,
+        chat_oid="chat",
+        ack=ack,
+        max_batch_size=2,
+    )
+    batcher.start()
+
+    for index in range(10):
+        await asyncio.wait_for(
+            batcher.put(orjson.dumps({"text": "text", "id": index}).decode()),
+            timeout=1,
+        )
+    await batcher.close()
+
+    assert [ack["ack"] for ack in acks] == list(range(10))
+    assert all(ack["error"] == "Message could not be stored" for ack in acks)
+    assert mediator.calls >= 5
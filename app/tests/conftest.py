@@ -1,3 +1,4 @@
+import pytest_asyncio
 from punq import Container
 from pytest import fixture
 
@@ -11,8 +12,9 @@ def container() -> Container:
     return init_dummy_container()
 
 
-@fixture()
-def mediator(container: Container) -> Mediator:
+# The scheduler of the background event dispatcher needs a running loop.
+@pytest_asyncio.fixture()
+async def mediator(container: Container) -> Mediator:
     return container.resolve(Mediator)
 
 
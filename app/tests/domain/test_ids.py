@@ -0,0 +1,32 @@
+from uuid import UUID
+
+from app.domain.entities.messages import Message
+from app.domain.events.messages import ChatDeletedEvent
+from app.domain.ids import UUID7Generator
+from app.domain.values.messages import Text
+
+
+def test_uuid7_ids_are_versioned_and_strictly_increasing():
+    generate = UUID7Generator()
+    ids = [generate() for _ in range(10_000)]
+
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    assert all(value.version == 7 for value in ids)
+    assert all(value.variant == "specified in RFC 4122" for value in ids)
+
+
+def test_entities_and_events_get_time_ordered_ids():
+    messages = [
+        Message(text=Text(value=str(index)), chat_oid="chat", source="web")
+        for index in range(100)
+    ]
+    events = [ChatDeletedEvent(chat_oid="chat") for _ in range(100)]
+
+    assert [message.oid for message in messages] == sorted(
+        message.oid for message in messages
+    )
+    assert UUID(messages[0].oid).version == 7
+    assert [event.event_id for event in events] == sorted(
+        event.event_id for event in events
+    )
@@ -1,10 +1,20 @@
+import asyncio
+
 from punq import (
     Container,
     Scope,
 )
 
-from app.infra.repositories.messages.base import BaseChatsRepository
-from app.infra.repositories.messages.memory import MemoryChatsRepository
+from app.infra.message_brokers.base import BaseMessageBroker
+from app.infra.message_brokers.memory import MemoryMessageBroker
+from app.infra.repositories.messages.base import (
+    BaseChatsRepository,
+    BaseMessagesRepository,
+)
+from app.infra.repositories.messages.memory import (
+    MemoryChatsRepository,
+    MemoryMessagesRepository,
+)
 from app.logic.init import _init_container
 
 
@@ -15,5 +25,44 @@ def init_dummy_container() -> Container:
         MemoryChatsRepository,
         scope=Scope.singleton,
     )
+    container.register(
+        BaseMessagesRepository,
+        MemoryMessagesRepository,
+        scope=Scope.singleton,
+    )
+    container.register(
+        BaseMessageBroker,
+        MemoryMessageBroker,
+        scope=Scope.singleton,
+    )
 
     return container
+
+
+class DummyWebSocket:
+    def __init__(self, send_delay: float = 0):
+        self.send_delay = send_delay
+        self.sent: list[bytes] = []
+        self.sent_json: list[dict] = []
+        self.sent_text: list[str] = []
+        self.is_accepted = False
+        self.close_code: int | None = None
+
+    async def accept(self):
+        self.is_accepted = True
+
+    async def send_bytes(self, data: bytes):
+        if self.send_delay:
+            await asyncio.sleep(self.send_delay)
+        self.sent.append(data)
+
+    async def send_json(self, data: dict):
+        self.sent_json.append(data)
+
+    async def send_text(self, data: str):
+        if self.send_delay:
+            await asyncio.sleep(self.send_delay)
+        self.sent_text.append(data)
+
+    async def close(self, code: int = 1000, reason: str | None = None):
+        self.close_code = code
@@ -0,0 +1,37 @@
+import orjson
+
+from app.infra.message_brokers.converters import (
+    convert_broker_record_to_chat_oid,
+    convert_payloads_to_frame,
+)
+from app.infra.message_brokers.dtos import BrokerRecord
+
+
+def test_chat_oid_is_read_from_record_key():
+    record = BrokerRecord(topic="topic", key=b"chat-oid", value=b"not a json")
+
+    assert convert_broker_record_to_chat_oid(record) == "chat-oid"
+
+
+def test_chat_oid_falls_back_to_record_value():
+    record = BrokerRecord(
+        topic="topic",
+        key=None,
+        value=orjson.dumps({"chat_oid": "chat-oid", "message_text": "text"}),
+    )
+
+    assert convert_broker_record_to_chat_oid(record) == "chat-oid"
+
+
+def test_single_payload_frame_is_sent_as_is():
+    payload = orjson.dumps({"message_text": "text"})
+
+    assert convert_payloads_to_frame([payload]) == payload
+
+
+def test_several_payloads_are_combined_into_one_frame():
+    payloads = [orjson.dumps({"message_text": text}) for text in ("first", "second")]
+
+    assert orjson.loads(convert_payloads_to_frame(payloads)) == {
+        "messages": [{"message_text": "first"}, {"message_text": "second"}],
+    }
@@ -0,0 +1,236 @@
+import asyncio
+
+import pytest
+from aiokafka import (
+    AIOKafkaConsumer,
+    TopicPartition,
+)
+
+from app.infra.message_brokers.kafka import (
+    KafkaMessageBroker,
+    refresh_topics_metadata,
+)
+from app.infra.message_brokers.offsets import BaseOffsetsStore
+
+
+class DummyProducer:
+    def __init__(self):
+        self.deliveries: list[asyncio.Future] = []
+
+    async def send(self, topic: str, value: bytes, key: bytes):
+        delivery = asyncio.get_running_loop().create_future()
+        self.deliveries.append(delivery)
+        return delivery
+
+
+@pytest.mark.asyncio
+async def test_send_message_without_waiting_for_delivery():
+    producer = DummyProducer()
+    failures = []
+    broker = KafkaMessageBroker(
+        producer=producer,
+        consumer=None,
+        wait_for_delivery=False,
+        on_delivery_failure=lambda topic, key, error: failures.append(key),
+    )
+
+    first = await broker.send_message(key=b"first", topic="topic", value=b"value")
+    second = await broker.send_message(key=b"second", topic="topic", value=b"value")
+
+    assert not first.done() and not second.done()
+
+    first.set_result(None)
+    second.set_exception(ConnectionError())
+    await asyncio.sleep(0)
+
+    assert failures == [b"second"]
+
+
+@pytest.mark.asyncio
+async def test_send_messages_enqueues_all_before_waiting():
+    producer = DummyProducer()
+    broker = KafkaMessageBroker(producer=producer, consumer=None)
+
+    sending = asyncio.create_task(
+        broker.send_messages(
+            topic="topic",
+            messages=[(b"chat", b"first"), (b"chat", b"second")],
+        ),
+    )
+    await asyncio.sleep(0)
+
+    assert len(producer.deliveries) == 2
+    assert not sending.done()
+
+    for delivery in producer.deliveries:
+        delivery.set_result(None)
+
+    await sending
+
+
+@pytest.mark.asyncio
+async def test_send_message_respects_max_in_flight():
+    producer = DummyProducer()
+    broker = KafkaMessageBroker(
+        producer=producer,
+        consumer=None,
+        wait_for_delivery=False,
+        max_in_flight=1,
+    )
+
+    await broker.send_message(key=b"first", topic="topic", value=b"value")
+    pending = asyncio.create_task(
+        broker.send_message(key=b"second", topic="topic", value=b"value"),
+    )
+    await asyncio.sleep(0)
+
+    assert not pending.done()
+
+    producer.deliveries[0].set_result(None)
+    await asyncio.wait_for(pending, timeout=1)
+
+    assert len(producer.deliveries) == 2
+
+
+class DummyClient:
+    def __init__(self):
+        self.cluster = object()
+        self.requested_topics: list[list[str]] = []
+
+    async def _metadata_update(self, cluster, topics: list[str]):
+        self.requested_topics.append(topics)
+        return True
+
+
+class DummyConsumer:
+    def __init__(self, partitions: dict[str, set[int]]):
+        self.partitions = partitions
+        self.assigned: list[TopicPartition] = []
+        self.positions: dict[TopicPartition, int | str] = {}
+        self._client = DummyClient()
+
+    def partitions_for_topic(self, topic: str):
+        return self.partitions.get(topic)
+
+    def assignment(self) -> set[TopicPartition]:
+        return set(self.assigned)
+
+    async def position(self, partition: TopicPartition) -> int | str:
+        return self.positions[partition]
+
+    def subscribe(self, topics: list[str]):
+        raise AssertionError("Broadcast consumer must not join a group")
+
+    def assign(self, partitions: list[TopicPartition]):
+        self.assigned = partitions
+
+    def seek(self, partition: TopicPartition, offset: int):
+        self.positions[partition] = offset
+
+    async def seek_to_end(self, *partitions: TopicPartition):
+        for partition in partitions:
+            self.positions[partition] = "end"
+
+    async def seek_to_beginning(self, *partitions: TopicPartition):
+        for partition in partitions:
+            self.positions[partition] = "beginning"
+
+    async def getmany(self, timeout_ms: int, max_records: int):
+        await asyncio.sleep(timeout_ms / 1000)
+        return {}
+
+
+class DummyOffsetsStore(BaseOffsetsStore):
+    def __init__(self, offsets: dict[TopicPartition, int]):
+        self.offsets = offsets
+
+    async def get_offsets(self, instance_id, partitions):
+        return {
+            partition: offset
+            for partition, offset in self.offsets.items()
+            if partition in partitions
+        }
+
+    async def save_offsets(self, instance_id, offsets):
+        self.offsets.update(offsets)
+
+
+@pytest.mark.asyncio
+async def test_broadcast_consumer_assigns_all_partitions():
+    consumer = DummyConsumer(partitions={"topic": {0, 1, 2}})
+    broker = KafkaMessageBroker(
+        producer=None,
+        consumer=consumer,
+        broadcast=True,
+        instance_id="instance",
+        offsets_store=DummyOffsetsStore({TopicPartition("topic", 1): 42}),
+    )
+
+    await broker._subscribe(topics=["topic"])
+
+    assert consumer.assigned == [TopicPartition("topic", index) for index in range(3)]
+    assert consumer.positions == {
+        TopicPartition("topic", 0): "end",
+        TopicPartition("topic", 1): 42,
+        TopicPartition("topic", 2): "end",
+    }
+
+
+@pytest.mark.asyncio
+async def test_broadcast_consumer_picks_up_missing_topic_later():
+    consumer = DummyConsumer(partitions={"topic": {0}})
+    broker = KafkaMessageBroker(
+        producer=None,
+        consumer=consumer,
+        broadcast=True,
+        metadata_retry_backoff_ms=1,
+    )
+    batches = broker.start_consuming_batches(
+        topics=["topic", "missing"],
+        max_records=10,
+        timeout_ms=1,
+    )
+    consuming = asyncio.create_task(anext(batches))
+    await asyncio.sleep(0.01)
+
+    assert consumer.assigned == [TopicPartition("topic", 0)]
+
+    consumer.positions[TopicPartition("topic", 0)] = 7
+    consumer.partitions["missing"] = {0}
+    await asyncio.sleep(0.01)
+    consuming.cancel()
+
+    assert consumer.assigned == [
+        TopicPartition("topic", 0),
+        TopicPartition("missing", 0),
+    ]
+    assert consumer.positions == {
+        TopicPartition("topic", 0): 7,
+        TopicPartition("missing", 0): "beginning",
+    }
+    assert consumer._client.requested_topics[0] == ["topic", "missing"]
+
+
+@pytest.mark.asyncio
+async def test_refresh_topics_metadata_uses_the_aiokafka_client(monkeypatch):
+    consumer = AIOKafkaConsumer(bootstrap_servers="localhost:9092")
+    requested = []
+
+    async def metadata_update(cluster, topics):
+        requested.append((cluster, topics))
+        return True
+
+    monkeypatch.setattr(consumer._client, "_metadata_update", metadata_update)
+
+    await refresh_topics_metadata(consumer, ["topic"])
+
+    assert requested == [(consumer._client.cluster, ["topic"])]
+
+
+@pytest.mark.asyncio
+async def test_refresh_topics_metadata_fails_without_the_client_internals():
+    consumer = DummyConsumer(partitions={})
+    del consumer._client.cluster
+
+    with pytest.raises(RuntimeError):
+        await refresh_topics_metadata(consumer, ["topic"])
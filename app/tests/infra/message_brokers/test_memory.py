@@ -0,0 +1,34 @@
+import asyncio
+
+import pytest
+
+from app.infra.message_brokers.dtos import BrokerRecord
+from app.infra.message_brokers.memory import MemoryMessageBroker
+
+
+@pytest.mark.asyncio
+async def test_memory_broker_delivers_subscribed_topics_in_batches():
+    broker = MemoryMessageBroker()
+    await broker.send_message(key=b"chat", topic="topic", value=b"before")
+
+    batches = broker.start_consuming_batches(
+        topics=["topic", "other"],
+        max_records=2,
+        timeout_ms=100,
+    )
+    consuming = asyncio.create_task(anext(batches))
+    await asyncio.sleep(0)
+
+    await broker.send_messages(
+        topic="topic",
+        messages=[(b"chat", b"first"), (b"chat", b"second"), (b"chat", b"third")],
+    )
+    await broker.send_message(key=b"chat", topic="ignored", value=b"ignored")
+
+    assert await asyncio.wait_for(consuming, timeout=1) == [
+        BrokerRecord(topic="topic", key=b"chat", value=b"first"),
+        BrokerRecord(topic="topic", key=b"chat", value=b"second"),
+    ]
+    assert await anext(batches) == [
+        BrokerRecord(topic="topic", key=b"chat", value=b"third"),
+    ]
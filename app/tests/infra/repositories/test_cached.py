@@ -0,0 +1,72 @@
+import pytest
+
+from app.domain.entities.messages import Chat
+from app.domain.values.messages import Title
+from app.infra.repositories.messages.cached import CachedChatsRepository
+
+
+class CountingChatsRepository:
+    def __init__(self, chats: list[Chat]):
+        self.chats = {chat.oid: chat for chat in chats}
+        self.lookups = 0
+
+    async def get_chat_by_oid(self, oid: str) -> Chat | None:
+        self.lookups += 1
+        return self.chats.get(oid)
+
+    async def delete_chat_by_oid(self, chat_oid: str) -> None:
+        self.chats.pop(chat_oid, None)
+
+
+@pytest.mark.asyncio
+async def test_chat_is_read_through_once():
+    chat = Chat(title=Title("title"))
+    repository = CountingChatsRepository([chat])
+    cache = CachedChatsRepository(repository=repository)
+
+    first = await cache.get_chat_by_oid(chat.oid)
+    second = await cache.get_chat_by_oid(chat.oid)
+
+    assert first == second == chat
+    assert first is not second
+    assert repository.lookups == 1
+    assert cache.stats().hits == 1
+    assert cache.stats().misses == 1
+
+
+@pytest.mark.asyncio
+async def test_unknown_chat_is_cached_negatively():
+    repository = CountingChatsRepository([])
+    cache = CachedChatsRepository(repository=repository)
+
+    assert await cache.get_chat_by_oid("unknown") is None
+    assert not await cache.check_chat_exists_by_oid("unknown")
+    assert repository.lookups == 1
+    assert cache.stats().negative_hits == 1
+
+
+@pytest.mark.asyncio
+async def test_chat_is_invalidated_on_delete():
+    chat = Chat(title=Title("title"))
+    repository = CountingChatsRepository([chat])
+    cache = CachedChatsRepository(repository=repository)
+
+    await cache.get_chat_by_oid(chat.oid)
+    await cache.delete_chat_by_oid(chat.oid)
+
+    assert await cache.get_chat_by_oid(chat.oid) is None
+    assert repository.lookups == 2
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_chat_is_evicted():
+    chats = [Chat(title=Title(f"title {index}")) for index in range(3)]
+    repository = CountingChatsRepository(chats)
+    cache = CachedChatsRepository(repository=repository, max_size=2)
+
+    for chat in chats:
+        await cache.get_chat_by_oid(chat.oid)
+    await cache.get_chat_by_oid(chats[0].oid)
+
+    assert repository.lookups == 4
+    assert cache.stats().evictions == 2
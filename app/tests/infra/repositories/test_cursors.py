@@ -0,0 +1,17 @@
+from datetime import datetime
+
+import pytest
+
+from app.infra.repositories.filters.cursors import Cursor
+
+
+def test_cursor_round_trip():
+    cursor = Cursor(created_at=datetime(2024, 7, 1, 12, 30, 15, 123000), oid="oid")
+
+    assert Cursor.decode(cursor.encode()) == cursor
+
+
+@pytest.mark.parametrize("value", ["", "not-a-cursor", "WyJmb28iXQ=="])
+def test_invalid_cursor(value: str):
+    with pytest.raises(ValueError):
+        Cursor.decode(value)
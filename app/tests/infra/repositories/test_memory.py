@@ -0,0 +1,95 @@
+from datetime import (
+    datetime,
+    timedelta,
+)
+
+import pytest
+
+from app.domain.entities.messages import (
+    Chat,
+    Message,
+)
+from app.domain.values.messages import (
+    Text,
+    Title,
+)
+from app.infra.repositories.filters.cursors import Cursor
+from app.infra.repositories.filters.messages import (
+    CountMode,
+    GetAllChatsFilters,
+    GetMessagesFilters,
+)
+from app.infra.repositories.messages.memory import (
+    MemoryChatsRepository,
+    MemoryMessagesRepository,
+)
+
+
+def create_message(index: int, created_at: datetime) -> Message:
+    return Message(
+        oid=f"message-{index}",
+        text=Text(value=str(index)),
+        chat_oid="chat",
+        source="web",
+        created_at=created_at,
+    )
+
+
+@pytest.mark.asyncio
+async def test_messages_are_paginated_in_time_order():
+    repository = MemoryMessagesRepository()
+    now = datetime.now()
+    # Inserted out of order, the page has to be sorted anyway.
+    for index in [0, 2, 1, 4, 3]:
+        await repository.add_message(
+            create_message(index, now + timedelta(seconds=index)),
+        )
+
+    first_page, count = await repository.get_messages(
+        chat_oid="chat",
+        filters=GetMessagesFilters(limit=2),
+    )
+    last = first_page[-1]
+    next_page, _ = await repository.get_messages(
+        chat_oid="chat",
+        filters=GetMessagesFilters(
+            limit=2,
+            after=Cursor(created_at=last.created_at, oid=last.oid),
+        ),
+    )
+    previous_page, _ = await repository.get_messages(
+        chat_oid="chat",
+        filters=GetMessagesFilters(
+            limit=2,
+            before=Cursor(created_at=next_page[0].created_at, oid=next_page[0].oid),
+            count=CountMode.NONE,
+        ),
+    )
+
+    assert [message.oid for message in first_page] == ["message-0", "message-1"]
+    assert [message.oid for message in next_page] == ["message-2", "message-3"]
+    assert previous_page == first_page
+    assert count == 5
+
+
+@pytest.mark.asyncio
+async def test_chats_are_indexed_and_handed_out_as_copies():
+    repository = MemoryChatsRepository()
+    chats = [Chat(title=Title(value=f"chat {index}")) for index in range(3)]
+    for chat in chats:
+        await repository.add_chat(chat)
+
+    chat = await repository.get_chat_by_oid(chats[1].oid)
+    chat.add_message(create_message(0, datetime.now()))
+    await repository.add_telegram_listener(chats[1].oid, telegram_chat_id="listener")
+    await repository.delete_chat_by_oid(chats[0].oid)
+    page, count = await repository.get_all_chats(GetAllChatsFilters(offset=1))
+
+    assert await repository.check_chat_exists_by_title("chat 1")
+    assert not await repository.check_chat_exists_by_title("chat 0")
+    assert not (await repository.get_chat_by_oid(chats[1].oid)).messages
+    assert [listener.oid for listener in await repository.get_listeners(chat.oid)] == [
+        "listener",
+    ]
+    assert page == [chats[2]]
+    assert count == 2
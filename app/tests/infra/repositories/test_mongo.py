@@ -0,0 +1,162 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.domain.entities.messages import Message
+from app.domain.values.messages import Text
+from app.infra.repositories.filters.cursors import Cursor
+from app.infra.repositories.filters.messages import (
+    CountMode,
+    GetAllChatsFilters,
+)
+from app.infra.repositories.messages.mongo import (
+    MongoDBChatsRepository,
+    MongoDBMessagesRepository,
+)
+
+
+class DummyCollection:
+    def __init__(self):
+        self.indexes = {"_id_": {"key": [("_id", 1)]}}
+
+    async def index_information(self):
+        return self.indexes
+
+    async def create_indexes(self, indexes):
+        for index in indexes:
+            self.indexes[index.document["name"]] = index.document
+
+
+class DummyFindCursor:
+    def __init__(self, query: dict):
+        self.query = query
+        self.sort_keys: list = []
+        self.skipped = 0
+
+    def sort(self, keys):
+        self.sort_keys = keys
+        return self
+
+    def skip(self, count: int):
+        self.skipped = count
+        return self
+
+    def limit(self, count: int):
+        return self
+
+    async def to_list(self, length: int):
+        return []
+
+
+class DummyFindCollection:
+    def __init__(self):
+        self.cursors: list[DummyFindCursor] = []
+
+    def find(self, query: dict):
+        cursor = DummyFindCursor(query)
+        self.cursors.append(cursor)
+        return cursor
+
+
+class DummyWriteCollection:
+    def __init__(self):
+        self.inserts: list[list[dict]] = []
+        self.updates: list = []
+
+    async def insert_many(self, documents, ordered=True):
+        await asyncio.sleep(0)
+        self.inserts.append(documents)
+
+    async def bulk_write(self, requests, ordered=True):
+        self.updates.extend(requests)
+
+
+@pytest.mark.asyncio
+async def test_missing_indexes_are_reported_until_ensured():
+    collection = DummyCollection()
+    repository = MongoDBChatsRepository(
+        mongo_db_client={"chat": {"chat": collection}},
+        mongo_db_name="chat",
+        mongo_db_collection_name="chat",
+    )
+
+    missing = await repository.get_missing_indexes()
+
+    assert {index.document["name"] for index in missing} == {
+        "oid_unique",
+        "title_unique",
+        "created_at_oid",
+    }
+
+    await repository.ensure_indexes()
+    await repository.ensure_indexes()
+
+    assert not await repository.get_missing_indexes()
+
+
+@pytest.mark.asyncio
+async def test_group_commit_writes_concurrent_messages_at_once():
+    messages_collection = DummyWriteCollection()
+    chats_collection = DummyWriteCollection()
+    repository = MongoDBMessagesRepository(
+        mongo_db_client={
+            "chat": {"messages": messages_collection, "chat": chats_collection},
+        },
+        mongo_db_name="chat",
+        mongo_db_collection_name="messages",
+        mongo_db_chats_collection_name="chat",
+        group_commit=True,
+        group_commit_max_delay=0.01,
+        group_commit_max_batch_size=3,
+    )
+    messages = [
+        Message(text=Text(value=str(index)), chat_oid="chat", source="web")
+        for index in range(4)
+    ]
+
+    await asyncio.gather(*(repository.add_message(message) for message in messages))
+    await repository.flush()
+    stats = repository.group_commit_stats()
+
+    assert [len(documents) for documents in messages_collection.inserts] == [3, 1]
+    assert len(chats_collection.updates) == 2
+    assert stats.flushes == 2
+    assert stats.documents == 4
+    assert stats.max_batch_size == 3
+    assert stats.average_batch_size == 2
+
+
+@pytest.mark.asyncio
+async def test_get_all_chats_starts_at_cursor():
+    collection = DummyFindCollection()
+    repository = MongoDBChatsRepository(
+        mongo_db_client={"chat": {"chat": collection}},
+        mongo_db_name="chat",
+        mongo_db_collection_name="chat",
+    )
+    cursor = Cursor(created_at=datetime(2024, 1, 1), oid="chat")
+
+    await repository.get_all_chats(
+        GetAllChatsFilters(offset=5, count=CountMode.NONE),
+    )
+    await repository.get_all_chats(
+        GetAllChatsFilters(after=cursor, offset=5, count=CountMode.NONE),
+    )
+    await repository.get_all_chats(
+        GetAllChatsFilters(before=cursor, count=CountMode.NONE),
+    )
+    first_page, after_page, before_page = collection.cursors
+
+    assert first_page.query == {} and first_page.skipped == 5
+    assert after_page.query == {
+        "$or": [
+            {"created_at": {"$gt": cursor.created_at}},
+            {"created_at": cursor.created_at, "oid": {"$gt": "chat"}},
+        ],
+    }
+    assert after_page.skipped == 0
+    assert before_page.query["$or"][0] == {
+        "created_at": {"$lt": cursor.created_at},
+    }
+    assert before_page.sort_keys == [("created_at", -1), ("oid", -1)]
@@ -0,0 +1,157 @@
+import asyncio
+
+import orjson
+import pytest
+
+from app.infra.websockets.managers import (
+    ConnectionManager,
+    OverflowPolicy,
+)
+from app.tests.fixtures import DummyWebSocket
+
+
+@pytest.mark.asyncio
+async def test_send_all_is_not_blocked_by_slow_connection():
+    manager = ConnectionManager()
+    slow_websocket = DummyWebSocket(send_delay=10)
+    fast_websocket = DummyWebSocket()
+
+    await manager.accept_connection(websocket=slow_websocket, key="chat")
+    await manager.accept_connection(websocket=fast_websocket, key="chat")
+
+    await asyncio.wait_for(manager.send_all(key="chat", bytes_=b"message"), timeout=1)
+    await asyncio.sleep(0)
+
+    assert fast_websocket.sent == [b"message"]
+    assert slow_websocket.sent == []
+
+
+@pytest.mark.asyncio
+async def test_send_all_drop_oldest_keeps_connection():
+    manager = ConnectionManager(
+        send_queue_size=2,
+        overflow_policy=OverflowPolicy.DROP_OLDEST,
+    )
+    websocket = DummyWebSocket(send_delay=10)
+    await manager.accept_connection(websocket=websocket, key="chat")
+    await asyncio.sleep(0)
+
+    for index in range(5):
+        await manager.send_all(key="chat", bytes_=str(index).encode())
+
+    sender = manager.senders_map[websocket]
+
+    assert websocket in manager.connections_map["chat"]
+    assert [sender.queue.get_nowait() for _ in range(2)] == [b"3", b"4"]
+
+
+@pytest.mark.asyncio
+async def test_send_all_disconnect_evicts_overflowing_connection():
+    manager = ConnectionManager(
+        send_queue_size=1,
+        overflow_policy=OverflowPolicy.DISCONNECT,
+    )
+    websocket = DummyWebSocket(send_delay=10)
+    await manager.accept_connection(websocket=websocket, key="chat")
+    await asyncio.sleep(0)
+
+    for _ in range(3):
+        await manager.send_all(key="chat", bytes_=b"message")
+    await asyncio.sleep(0)
+
+    assert "chat" not in manager.connections_map
+    assert websocket not in manager.senders_map
+    assert websocket.close_code is not None
+
+
+@pytest.mark.asyncio
+async def test_send_all_numbers_json_frames_per_chat():
+    manager = ConnectionManager(epoch="node")
+    websocket = DummyWebSocket()
+    await manager.accept_connection(websocket=websocket, key="chat")
+
+    await manager.send_all(key="chat", bytes_=b'{"text": "first"}')
+    await manager.send_all(key="chat", bytes_=b"{}")
+    await manager.send_all(key="other", bytes_=b'{"text": "other"}')
+    await asyncio.sleep(0)
+
+    assert websocket.sent == [
+        b'{"seq":1,"epoch":"node","text": "first"}',
+        b'{"seq":2,"epoch":"node"}',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_reconnect_replays_missed_frames_or_asks_to_resync():
+    manager = ConnectionManager(epoch="node", replay_buffer_size=2)
+    for index in range(3):
+        await manager.send_all(key="chat", bytes_=b'{"index": %d}' % index)
+
+    replayed = DummyWebSocket()
+    too_old = DummyWebSocket()
+    other_node = DummyWebSocket()
+    await manager.accept_connection(replayed, key="chat", since=2, epoch="node")
+    await manager.accept_connection(too_old, key="chat", since=0, epoch="node")
+    await manager.accept_connection(other_node, key="chat", since=2, epoch="old")
+    await asyncio.sleep(0)
+
+    assert replayed.sent == [b'{"seq":3,"epoch":"node","index": 2}']
+    assert orjson.loads(too_old.sent[0]) == {"resync": True, "seq": 3, "epoch": "node"}
+    assert orjson.loads(other_node.sent[0])["resync"]
+
+
+@pytest.mark.asyncio
+async def test_evicted_replay_buffers_do_not_reuse_sequence_numbers():
+    manager = ConnectionManager(epoch="node", max_replay_buffers=1)
+    await manager.send_all(key="chat", bytes_=b"{}")
+    await manager.send_all(key="chat", bytes_=b"{}")
+    await manager.send_all(key="other", bytes_=b"{}")
+    await manager.send_all(key="chat", bytes_=b"{}")
+
+    websocket = DummyWebSocket()
+    await manager.accept_connection(websocket, key="chat", since=1, epoch="node")
+    await asyncio.sleep(0)
+
+    assert list(manager.replay_buffers) == ["chat"]
+    assert manager.replay_buffers["chat"].seq == 3
+    assert orjson.loads(websocket.sent[0])["resync"]
+
+
+@pytest.mark.asyncio
+async def test_remove_connection_drops_empty_chat():
+    manager = ConnectionManager()
+    first = DummyWebSocket()
+    second = DummyWebSocket()
+    await manager.accept_connection(websocket=first, key="chat")
+    await manager.accept_connection(websocket=second, key="chat")
+
+    await manager.remove_connection(websocket=first, key="chat")
+
+    assert manager.connections_map["chat"] == {second}
+
+    await manager.remove_connection(websocket=second, key="chat")
+    await manager.remove_connection(websocket=second, key="chat")
+
+    assert manager.connections_map == {}
+    assert manager.senders_map == {}
+
+
+@pytest.mark.asyncio
+async def test_disconnect_all_is_not_blocked_by_unresponsive_connection():
+    manager = ConnectionManager(close_timeout=0.01)
+    unresponsive_websocket = DummyWebSocket(send_delay=10)
+    websocket = DummyWebSocket()
+    await manager.accept_connection(websocket=unresponsive_websocket, key="chat")
+    await manager.accept_connection(websocket=websocket, key="chat")
+
+    task = asyncio.create_task(manager.disconnect_all(key="chat"))
+    await asyncio.sleep(0)
+
+    assert "chat" not in manager.connections_map
+
+    await asyncio.wait_for(task, timeout=1)
+
+    assert websocket.sent_text == ['{"message":"Chat has been deleted."}']
+    assert websocket.close_code is not None
+    assert unresponsive_websocket.close_code is None
+    assert manager.senders_map == {}
@@ -0,0 +1,120 @@
+import asyncio
+from dataclasses import dataclass
+
+import orjson
+import pytest
+from aiojobs import Scheduler
+
+from app.domain.events.messages import (
+    ChatDeletedEvent,
+    NewMessageReceivedEvent,
+)
+from app.logic.events.base import EventHandler
+from app.logic.events.dispatchers import BackgroundEventDispatcher
+from app.logic.events.messages import NewMessageReceivedEventHandler
+from app.logic.mediator.base import Mediator
+
+
+@dataclass
+class DummyEventHandler(EventHandler[ChatDeletedEvent, None]):
+    fail_times: int = 0
+    delay: float = 0
+
+    def __post_init__(self):
+        self.handled: list[ChatDeletedEvent] = []
+
+    async def handle(self, event: ChatDeletedEvent) -> None:
+        await asyncio.sleep(self.delay)
+
+        if self.fail_times:
+            self.fail_times -= 1
+            raise RuntimeError("Broker is not available")
+
+        self.handled.append(event)
+
+
+@dataclass
+class DummySynchronousEventHandler(DummyEventHandler):
+    synchronous = True
+
+
+def create_handler(handler_class=DummyEventHandler, **kwargs) -> DummyEventHandler:
+    return handler_class(message_broker=None, connection_manager=None, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_background_publish_returns_before_handlers():
+    dispatcher = BackgroundEventDispatcher(scheduler=Scheduler())
+    mediator = Mediator(background_dispatcher=dispatcher)
+    handler = create_handler(delay=0.01)
+    synchronous_handler = create_handler(DummySynchronousEventHandler, delay=0.01)
+    mediator.register_event(ChatDeletedEvent, [handler, synchronous_handler])
+
+    await mediator.publish([ChatDeletedEvent(chat_oid="chat")], background=True)
+
+    assert handler.handled == []
+    assert len(synchronous_handler.handled) == 1
+
+    await dispatcher.drain(timeout=1)
+
+    assert len(handler.handled) == 1
+    assert dispatcher.stats().processed == 1
+    assert dispatcher.stats().queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_background_dispatcher_retries_and_drops():
+    dispatcher = BackgroundEventDispatcher(
+        scheduler=Scheduler(),
+        max_pending=1,
+        retries=2,
+        retry_delay=0,
+    )
+    handler = create_handler(fail_times=2)
+    event = ChatDeletedEvent(chat_oid="chat")
+
+    assert await dispatcher.dispatch(handler=handler, event=event)
+    assert not await dispatcher.dispatch(handler=handler, event=event)
+
+    await dispatcher.drain(timeout=1)
+    stats = dispatcher.stats()
+
+    assert handler.handled == [event]
+    assert stats.retried == 2
+    assert stats.dropped == 1
+    assert stats.failed == 0
+
+
+class DummyMessageBroker:
+    def __init__(self):
+        self.sent: list[bytes] = []
+
+    async def send_message(self, key: bytes, topic: str, value: bytes):
+        self.sent.append(orjson.loads(value)["message_oid"])
+
+
+@pytest.mark.asyncio
+async def test_new_messages_are_sent_in_order_before_publish_returns():
+    dispatcher = BackgroundEventDispatcher(scheduler=Scheduler())
+    mediator = Mediator(background_dispatcher=dispatcher)
+    message_broker = DummyMessageBroker()
+    handler = NewMessageReceivedEventHandler(
+        message_broker=message_broker,
+        connection_manager=None,
+        broker_topic="topic",
+    )
+    mediator.register_event(NewMessageReceivedEvent, [handler])
+    events = [
+        NewMessageReceivedEvent(
+            message_text="text",
+            message_oid=str(index),
+            chat_oid="chat",
+            source="web",
+        )
+        for index in range(3)
+    ]
+
+    await mediator.publish(events, background=True)
+
+    assert message_broker.sent == ["0", "1", "2"]
+    assert dispatcher.stats().dispatched == 0
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from app.logic.events.dispatchers import PartitionedEventDispatcher
+from app.logic.events.messages import NewMessagePayloadsReceivedFromBrokerEvent
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_keeps_order_per_key():
+    handled = []
+
+    async def handler(events):
+        await asyncio.sleep(0)
+        handled.extend((event.chat_oid, event.payloads[0]) for event in events)
+
+    dispatcher = PartitionedEventDispatcher(handler=handler, workers_count=4)
+    dispatcher.start()
+
+    for index in range(20):
+        chat_oid = f"chat-{index % 3}"
+        await dispatcher.dispatch(
+            key=chat_oid,
+            event=NewMessagePayloadsReceivedFromBrokerEvent(
+                chat_oid=chat_oid,
+                payloads=[str(index).encode()],
+            ),
+        )
+
+    while len(handled) < 20:
+        await asyncio.sleep(0)
+    await dispatcher.stop()
+
+    for chat_index in range(3):
+        payloads = [
+            int(payload)
+            for chat_oid, payload in handled
+            if chat_oid == f"chat-{chat_index}"
+        ]
+        assert payloads == sorted(payloads)
+
+
+@pytest.mark.asyncio
+async def test_slow_key_does_not_block_other_workers():
+    handled = []
+    blocked = asyncio.Event()
+
+    async def handler(events):
+        for event in events:
+            if event.chat_oid == "slow":
+                await blocked.wait()
+            handled.append(event.chat_oid)
+
+    dispatcher = PartitionedEventDispatcher(handler=handler, workers_count=64)
+    dispatcher.start()
+
+    keys = ["slow"] + [f"chat-{index}" for index in range(20)]
+    for key in keys:
+        await dispatcher.dispatch(
+            key=key,
+            event=NewMessagePayloadsReceivedFromBrokerEvent(chat_oid=key, payloads=[]),
+        )
+    await asyncio.sleep(0.01)
+
+    assert "slow" not in handled
+    assert handled
+    assert sum(stats.queue_depth for stats in dispatcher.stats()) == 0
+
+    blocked.set()
+    await dispatcher.stop()
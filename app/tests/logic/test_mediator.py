@@ -0,0 +1,269 @@
+import asyncio
+from dataclasses import (
+    dataclass,
+    field,
+)
+
+import pytest
+
+from app.domain.events.messages import ChatDeletedEvent
+from app.logic.events.base import EventHandler
+from app.logic.mediator.base import Mediator
+from app.logic.mediator.middlewares import (
+    BaseMediatorMiddleware,
+    ExceptionCountingMiddleware,
+    InFlightMiddleware,
+    LatencyHistogramMiddleware,
+)
+from app.logic.queries.base import (
+    BaseQuery,
+    BaseQueryHandler,
+)
+from app.logic.queries.messages import GetChatDetailQuery
+
+
+@dataclass(frozen=True)
+class DummyQuery(BaseQuery):
+    value: str
+
+
+@dataclass(frozen=True)
+class DummyQueryHandler(BaseQueryHandler[BaseQuery, str]):
+    calls: list[BaseQuery]
+
+    async def handle(self, query: BaseQuery) -> str:
+        self.calls.append(query)
+        await asyncio.sleep(0.01)
+
+        if query.value == "fail":
+            raise ValueError(query.value)
+
+        return query.value
+
+
+@dataclass(frozen=True)
+class DummyCoalescingQuery(DummyQuery):
+    coalesce = True
+
+
+@pytest.mark.asyncio
+async def test_handle_query_coalesces_concurrent_equal_queries():
+    calls = []
+    mediator = Mediator()
+    mediator.register_query(DummyCoalescingQuery, DummyQueryHandler(calls=calls))
+
+    results = await asyncio.gather(
+        *(mediator.handle_query(DummyCoalescingQuery(value="a")) for _ in range(10)),
+        mediator.handle_query(DummyCoalescingQuery(value="b")),
+    )
+
+    assert results == ["a"] * 10 + ["b"]
+    assert len(calls) == 2
+    assert mediator.coalescing_stats().executed == 2
+    assert mediator.coalescing_stats().coalesced == 9
+    assert mediator.coalescing_stats().in_flight == 0
+
+    await mediator.handle_query(DummyCoalescingQuery(value="a"))
+
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_handle_query_shares_errors_and_skips_not_coalescing_queries():
+    calls = []
+    mediator = Mediator()
+    handler = DummyQueryHandler(calls=calls)
+    mediator.register_query(DummyCoalescingQuery, handler)
+    mediator.register_query(DummyQuery, handler)
+
+    results = await asyncio.gather(
+        mediator.handle_query(DummyCoalescingQuery(value="fail")),
+        mediator.handle_query(DummyCoalescingQuery(value="fail")),
+        return_exceptions=True,
+    )
+    await asyncio.gather(
+        *(mediator.handle_query(DummyQuery(value="a")) for _ in range(3))
+    )
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len(calls) == 4
+
+
+def test_chat_detail_query_is_coalesced():
+    assert GetChatDetailQuery.coalesce
+
+
+@dataclass(eq=False)
+class RecordingMiddleware(BaseMediatorMiddleware):
+    name: str
+    calls: list[str]
+
+    async def __call__(self, message, call_next):
+        self.calls.append(f"{self.name}:before")
+        result = await call_next()
+        self.calls.append(f"{self.name}:after")
+
+        return result
+
+
+@pytest.mark.asyncio
+async def test_middlewares_wrap_queries_in_order():
+    calls = []
+    mediator = Mediator(
+        middlewares=[
+            RecordingMiddleware(name="outer", calls=calls),
+            RecordingMiddleware(name="inner", calls=calls),
+        ],
+    )
+    mediator.register_query(DummyQuery, DummyQueryHandler(calls=[]))
+
+    assert await mediator.handle_query(DummyQuery(value="a")) == "a"
+    assert calls == ["outer:before", "inner:before", "inner:after", "outer:after"]
+
+
+@pytest.mark.asyncio
+async def test_builtin_middlewares_collect_metrics():
+    in_flight = InFlightMiddleware()
+    exceptions = ExceptionCountingMiddleware()
+    latency = LatencyHistogramMiddleware(buckets=(0.001, 1))
+    mediator = Mediator(middlewares=[in_flight, exceptions, latency])
+    mediator.register_query(DummyQuery, DummyQueryHandler(calls=[]))
+
+    await mediator.handle_query(DummyQuery(value="a"))
+
+    with pytest.raises(ValueError):
+        await mediator.handle_query(DummyQuery(value="fail"))
+
+    histogram = latency.histograms["DummyQuery"]
+
+    assert histogram.count == 2
+    assert histogram.counts == [0, 2, 0]
+    assert in_flight.in_flight["DummyQuery"] == 0
+    assert exceptions.exceptions == {("DummyQuery", "ValueError"): 1}
+
+
+@dataclass
+class DummyEventHandler(EventHandler[ChatDeletedEvent, str]):
+    name: str = ""
+    handled: list[tuple[str, str]] = field(default_factory=list)
+    delay: float = 0
+    fail: bool = False
+
+    async def handle(self, event: ChatDeletedEvent) -> str:
+        await asyncio.sleep(self.delay)
+
+        if self.fail:
+            raise ValueError(self.name)
+
+        self.handled.append((self.name, event.chat_oid))
+
+        return self.name
+
+
+@dataclass
+class DummyOrderSensitiveEventHandler(DummyEventHandler):
+    order_sensitive = True
+
+
+def create_event_handler(handler_class=DummyEventHandler, **kwargs):
+    return handler_class(message_broker=None, connection_manager=None, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_publish_keeps_order_per_aggregate():
+    handled = []
+    mediator = Mediator()
+    mediator.register_event(
+        ChatDeletedEvent,
+        [
+            create_event_handler(
+                DummyOrderSensitiveEventHandler,
+                name="first",
+                handled=handled,
+                delay=0.02,
+            ),
+            create_event_handler(
+                DummyOrderSensitiveEventHandler,
+                name="second",
+                handled=handled,
+            ),
+            create_event_handler(name="independent", handled=handled),
+        ],
+    )
+
+    results = await mediator.publish(
+        [
+            ChatDeletedEvent(chat_oid="a"),
+            ChatDeletedEvent(chat_oid="b"),
+            ChatDeletedEvent(chat_oid="a"),
+        ],
+        concurrent=True,
+    )
+
+    assert results == ["first", "second", "independent"] * 3
+    assert [item for item in handled if item[0] != "independent"] == [
+        ("first", "a"),
+        ("first", "b"),
+        ("second", "a"),
+        ("second", "b"),
+        ("first", "a"),
+        ("second", "a"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_publish_runs_handlers_together_and_groups_errors():
+    handled = []
+    mediator = Mediator()
+    mediator.register_event(
+        ChatDeletedEvent,
+        [
+            create_event_handler(name="slow", handled=handled, delay=0.05),
+            create_event_handler(name="slow", handled=handled, delay=0.05),
+        ],
+    )
+
+    started_at = asyncio.get_running_loop().time()
+    await mediator.publish([ChatDeletedEvent(chat_oid="a")], concurrent=True)
+
+    assert asyncio.get_running_loop().time() - started_at < 0.09
+
+    mediator.register_event(
+        ChatDeletedEvent,
+        [
+            create_event_handler(name="first", handled=handled, fail=True),
+            create_event_handler(name="second", handled=handled, fail=True),
+        ],
+    )
+
+    with pytest.raises(ExceptionGroup) as error:
+        await mediator.publish([ChatDeletedEvent(chat_oid="a")], concurrent=True)
+
+    assert len(error.value.exceptions) == 2
+    assert handled == [("slow", "a")] * 4
+
+
+@dataclass
+class DummyBatchEventHandler(DummyEventHandler):
+    def __post_init__(self):
+        self.batches: list[list[ChatDeletedEvent]] = []
+
+    async def handle_batch(self, events: list[ChatDeletedEvent]) -> list[str]:
+        self.batches.append(events)
+
+        return [self.name] * len(events)
+
+
+@pytest.mark.asyncio
+async def test_publish_batch_calls_handlers_once_per_event_type():
+    batch_handler = create_event_handler(DummyBatchEventHandler, name="batch")
+    handler = create_event_handler(name="single")
+    mediator = Mediator()
+    mediator.register_event(ChatDeletedEvent, [batch_handler, handler])
+    events = [ChatDeletedEvent(chat_oid="a"), ChatDeletedEvent(chat_oid="b")]
+
+    results = await mediator.publish_batch(events)
+
+    assert results == ["batch", "batch", "single", "single"]
+    assert batch_handler.batches == [events]
+    assert handler.handled == [("single", "a"), ("single", "b")]
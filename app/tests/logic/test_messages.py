@@ -3,10 +3,21 @@ from faker import Faker
 
 from app.domain.entities.messages import Chat
 from app.domain.values.messages import Title
+from app.infra.repositories.filters.messages import (
+    CountMode,
+    GetAllChatsFilters,
+)
 from app.infra.repositories.messages.base import BaseChatsRepository
+from app.infra.websockets.managers import BaseConnectionManager
 from app.logic.commands.messages import CreateChatCommand
+from app.logic.events.messages import (
+    ChatDeletedFromBrokerEvent,
+    DisconnectChatEventHandler,
+    InvalidateChatCacheEventHandler,
+)
 from app.logic.exceptions.messages import ChatWithThatTitleAlreadyExistsException
 from app.logic.mediator.base import Mediator
+from app.tests.fixtures import DummyWebSocket
 
 
 @pytest.mark.asyncio
@@ -33,9 +44,65 @@ async def test_create_chat_command_title_already_exists(
     chat = Chat(title=Title(title_text))
     await chat_repository.add_chat(chat)
 
-    assert chat in chat_repository._saved_chats
+    assert await chat_repository.check_chat_exists_by_oid(chat.oid)
 
     with pytest.raises(ChatWithThatTitleAlreadyExistsException):
         await mediator.handle_command(CreateChatCommand(title=title_text))
 
-    assert len(chat_repository._saved_chats) == 1
+    _, count = await chat_repository.get_all_chats(
+        GetAllChatsFilters(count=CountMode.EXACT),
+    )
+
+    assert count == 1
+
+
+@pytest.mark.asyncio
+async def test_chat_deleted_from_broker_closes_connections(
+    container,
+    mediator: Mediator,
+):
+    connection_manager = container.resolve(BaseConnectionManager)
+    websocket = DummyWebSocket()
+    await connection_manager.accept_connection(websocket=websocket, key="chat")
+
+    await mediator.publish([ChatDeletedFromBrokerEvent(chat_oid="chat")])
+
+    assert "chat" not in connection_manager.connections_map
+    assert websocket.close_code is not None
+
+
+@pytest.mark.asyncio
+async def test_chat_deleted_from_broker_evicts_cache_before_closing_connections():
+    events: list[str] = []
+
+    class TrackingChatsCache:
+        def invalidate(self, chat_oid: str):
+            events.append("invalidate")
+
+    class TrackingConnectionManager:
+        async def disconnect_all(self, key: str):
+            events.append("disconnect")
+
+    mediator = Mediator()
+    connection_manager = TrackingConnectionManager()
+    mediator.register_event(
+        ChatDeletedFromBrokerEvent,
+        [
+            InvalidateChatCacheEventHandler(
+                message_broker=None,
+                connection_manager=connection_manager,
+                chats_cache=TrackingChatsCache(),
+            ),
+            DisconnectChatEventHandler(
+                message_broker=None,
+                connection_manager=connection_manager,
+            ),
+        ],
+    )
+
+    await mediator.publish(
+        [ChatDeletedFromBrokerEvent(chat_oid="chat")],
+        concurrent=True,
+    )
+
+    assert events == ["invalidate", "disconnect"]
@@ -0,0 +1,130 @@
+"""Measure the memory held by websocket connections and its growth under
+connection churn.
+
+The first part keeps ``connections`` connections spread over chats of
+``room_size``, the second one connects and disconnects them round after
+round; the memory left after every round should stay flat.
+
+Usage::
+
+    python -m benchmarks.connections [connections] [room_size] [rounds]
+"""
+
+import asyncio
+import gc
+import sys
+import time
+import tracemalloc
+
+from app.infra.websockets.managers import ConnectionManager
+
+
+class BenchmarkWebSocket:
+    async def accept(self):
+        pass
+
+    async def send_bytes(self, data: bytes):
+        pass
+
+    async def close(self, code: int = 1000, reason: str | None = None):
+        pass
+
+
+async def connect(
+    manager: ConnectionManager,
+    websockets: list[BenchmarkWebSocket],
+    room_size: int,
+    round_: int = 0,
+):
+    for index, websocket in enumerate(websockets):
+        await manager.accept_connection(
+            websocket=websocket,
+            key=f"chat-{round_}-{index // room_size}",
+        )
+
+
+async def disconnect(
+    manager: ConnectionManager,
+    websockets: list[BenchmarkWebSocket],
+    room_size: int,
+    round_: int = 0,
+):
+    for index, websocket in enumerate(websockets):
+        await manager.remove_connection(
+            websocket=websocket,
+            key=f"chat-{round_}-{index // room_size}",
+        )
+
+    # Lets the cancelled sender tasks finish and run their callbacks.
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+def get_traced_memory() -> int:
+    gc.collect()
+    allocated, _ = tracemalloc.get_traced_memory()
+
+    return allocated
+
+
+async def measure_footprint(connections: int, room_size: int):
+    manager = ConnectionManager()
+    websockets = [BenchmarkWebSocket() for _ in range(connections)]
+
+    tracemalloc.start()
+    baseline = get_traced_memory()
+    started_at = time.perf_counter()
+    await connect(manager, websockets, room_size=room_size)
+    elapsed = time.perf_counter() - started_at
+    allocated = get_traced_memory() - baseline
+
+    print(
+        f"{connections} connections in {len(manager.connections_map)} chats: "
+        f"{allocated / connections:8.0f} B/connection "
+        f"{elapsed / connections * 1_000_000:8.2f} us/connect",
+    )
+
+    started_at = time.perf_counter()
+    await disconnect(manager, websockets, room_size=room_size)
+    elapsed = time.perf_counter() - started_at
+    tracemalloc.stop()
+
+    print(
+        f"{len(manager.connections_map)} chats left: "
+        f"{elapsed / connections * 1_000_000:8.2f} us/disconnect",
+    )
+
+
+async def measure_churn(connections: int, room_size: int, rounds: int):
+    manager = ConnectionManager()
+    websockets = [BenchmarkWebSocket() for _ in range(connections)]
+
+    tracemalloc.start()
+    baseline = get_traced_memory()
+
+    # Every round uses new chats, like chats coming and going over a long
+    # uptime.
+    for round_ in range(rounds):
+        await connect(manager, websockets, room_size=room_size, round_=round_)
+        await disconnect(manager, websockets, room_size=room_size, round_=round_)
+        print(
+            f"round {round_:>3}: {len(manager.connections_map)} chats, "
+            f"{(get_traced_memory() - baseline) / 1024:10.1f} KiB retained",
+        )
+
+    tracemalloc.stop()
+
+
+async def main(connections: int, room_size: int, rounds: int):
+    await measure_footprint(connections, room_size=room_size)
+    await measure_churn(connections, room_size=room_size, rounds=rounds)
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            connections=int(sys.argv[1]) if len(sys.argv) > 1 else 100_000,
+            room_size=int(sys.argv[2]) if len(sys.argv) > 2 else 100,
+            rounds=int(sys.argv[3]) if len(sys.argv) > 3 else 5,
+        ),
+    )
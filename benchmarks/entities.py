@@ -0,0 +1,78 @@
+"""Measure memory and time of materializing pages of messages and events.
+
+Messages are rehydrated from documents the way a history page is read,
+events are created the way the bulk message path creates them.
+
+Usage::
+
+    python -m benchmarks.entities
+"""
+
+import time
+import tracemalloc
+from datetime import datetime
+
+from app.domain.events.messages import NewMessageReceivedEvent
+from app.infra.repositories.messages.converters import (
+    convert_message_document_to_entity,
+)
+
+
+PAGE_SIZES = (10, 100, 1_000, 10_000)
+
+
+def create_documents(page_size: int) -> list[dict]:
+    created_at = datetime.now()
+
+    return [
+        {
+            "oid": f"message-{index}",
+            "chat_oid": "chat",
+            "text": f"text {index}",
+            "source": "web",
+            "created_at": created_at,
+        }
+        for index in range(page_size)
+    ]
+
+
+def create_messages(documents: list[dict]) -> list:
+    return [convert_message_document_to_entity(document) for document in documents]
+
+
+def create_events(documents: list[dict]) -> list:
+    return [
+        NewMessageReceivedEvent(
+            message_text=document["text"],
+            message_oid=document["oid"],
+            chat_oid=document["chat_oid"],
+            source=document["source"],
+        )
+        for document in documents
+    ]
+
+
+def measure(name: str, create, documents: list[dict]):
+    tracemalloc.start()
+    started_at = time.perf_counter()
+    entities = create(documents)
+    elapsed = time.perf_counter() - started_at
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{name:<8} {len(entities):>6}: "
+        f"{allocated / len(entities):8.0f} B/item "
+        f"{elapsed / len(entities) * 1_000_000:8.2f} us/item",
+    )
+
+
+def main():
+    for page_size in PAGE_SIZES:
+        documents = create_documents(page_size)
+        measure("messages", create_messages, documents)
+        measure("events", create_events, documents)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Compare uuid4 and UUIDv7 ids: generation cost and MongoDB insert throughput.
+
+The insert part writes into a scratch collection with a unique ``oid``
+index, the way chats and messages are stored, and is skipped when MongoDB
+is not reachable.
+
+Usage::
+
+    MONGO_DB_CONNECTION_URI=mongodb://localhost:27017 \\
+        python -m benchmarks.ids [documents]
+"""
+
+import asyncio
+import os
+import sys
+import time
+import timeit
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import (
+    ASCENDING,
+    IndexModel,
+)
+from pymongo.errors import ServerSelectionTimeoutError
+
+from app.domain.ids import ID_GENERATORS
+
+
+async def measure_inserts(client: AsyncIOMotorClient, name: str, documents: int):
+    collection = client["benchmarks"][f"ids_{name}"]
+    await collection.drop()
+    await collection.create_indexes([IndexModel([("oid", ASCENDING)], unique=True)])
+    generate = ID_GENERATORS[name]
+
+    started_at = time.perf_counter()
+    for _ in range(0, documents, 1000):
+        await collection.insert_many(
+            [{"oid": str(generate())} for _ in range(1000)],
+            ordered=False,
+        )
+    elapsed = time.perf_counter() - started_at
+
+    await collection.drop()
+    print(f"{name} inserts:    {documents / elapsed:10.0f} docs/s")
+
+
+async def main(documents: int):
+    for name, generate in ID_GENERATORS.items():
+        elapsed = timeit.timeit(
+            lambda generate=generate: str(generate()), number=100_000
+        )
+        print(f"{name} generation: {elapsed / 100_000 * 1_000_000_000:10.0f} ns")
+
+    uri = os.environ.get("MONGO_DB_CONNECTION_URI", "mongodb://localhost:27017")
+    client = AsyncIOMotorClient(uri, serverSelectionTimeoutMS=3000)
+
+    try:
+        await client.server_info()
+    except ServerSelectionTimeoutError:
+        print(f"MongoDB at {uri} is not reachable, inserts are skipped")
+        return
+
+    for name in ID_GENERATORS:
+        await measure_inserts(client, name=name, documents=documents)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(documents=int(sys.argv[1]) if len(sys.argv) > 1 else 200_000))
@@ -0,0 +1,34 @@
+"""Compare building the mediator per request with resolving the singleton.
+
+Usage::
+
+    python -m benchmarks.mediator [number]
+"""
+
+import asyncio
+import os
+import sys
+import timeit
+
+os.environ.setdefault("MONGO_DB_CONNECTION_URI", "mongodb://localhost:27017")
+
+from app.logic.init import (
+    _init_mediator,
+    init_container,
+)
+from app.logic.mediator.base import Mediator
+
+
+async def main(number: int):
+    container = init_container()
+    container.resolve(Mediator)
+
+    rebuilt = timeit.timeit(lambda: _init_mediator(container), number=number)
+    resolved = timeit.timeit(lambda: container.resolve(Mediator), number=number)
+
+    print(f"rebuild per request: {rebuilt / number * 1_000_000:10.1f} us")
+    print(f"singleton resolve:   {resolved / number * 1_000_000:10.1f} us")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(number=int(sys.argv[1]) if len(sys.argv) > 1 else 1000))